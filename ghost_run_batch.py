@@ -0,0 +1,153 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ghost_run_game import Simulation
+from ghost_run_vecenv import heuristic_policy, observe_simulation
+
+DEFAULT_MAX_FRAMES = 60 * 60 * 5  # five minutes of play
+PRESS_NOISE = 0.005
+# Chunks per worker: enough that a slow chunk does not leave cores idle at
+# the end, few enough that IPC stays small next to the work
+CHUNKS_PER_WORKER = 4
+
+
+def lookahead_policy(sim):
+    return bool(heuristic_policy(observe_simulation(sim))[0])
+
+
+def run_episode(tuning, seed, max_frames=DEFAULT_MAX_FRAMES, noise=PRESS_NOISE):
+    sim = Simulation(tuning=tuning, seed=seed)
+    # Separate stream so the press noise never shifts the spawn sequence
+    presses = random.Random(seed ^ 0x5EED)
+    frames = sim.run_episode(
+        lambda s: lookahead_policy(s) or presses.random() < noise,
+        max_frames=max_frames,
+    )
+    cause = sim.crash_type if sim.crashed else "timeout"
+    return sim.score, frames, cause
+
+
+def run_chunk(task):
+    # One pickled task per chunk keeps IPC overhead small next to the work
+    index, tuning, seeds, max_frames, noise = task
+    return [(index, seed, *run_episode(tuning, seed, max_frames, noise)) for seed in seeds]
+
+
+def parse_grid(specs):
+    # ["SPAWN_MIN=30,40", "GRAVITY=1.1,1.2"] -> cartesian list of tuning dicts.
+    # Values are JSON; list values are separated by ";" instead, as in
+    # "OBSTACLE_WEIGHTS=[60,30,10];[40,40,20]".
+    axes = []
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if not values:
+            raise ValueError(f"Expected NAME=v1,v2,... but got {spec!r}")
+        separator = ";" if ";" in values or values.lstrip().startswith("[") else ","
+        axes.append([(name, json.loads(v)) for v in values.split(separator)])
+    return [dict(combo) for combo in itertools.product(*axes)]
+
+
+def parse_seeds(spec):
+    start, _, stop = spec.partition(":")
+    return range(int(start), int(stop)) if stop else range(int(start))
+
+
+def load_grid(path):
+    # {"grid": {"SPAWN_MIN": [30, 40]}} and/or {"sets": [{"GRAVITY": 1.1}, ...]}
+    with open(path, "r") as f:
+        data = json.load(f)
+    grid = data.get("grid", {})
+    sets = [dict(zip(grid, combo)) for combo in itertools.product(*grid.values())] if grid else []
+    return sets + data.get("sets", [])
+
+
+def chunked(seeds, size):
+    seeds = list(seeds)
+    for i in range(0, len(seeds), size):
+        yield seeds[i:i + size]
+
+
+def default_chunk_size(episodes, workers):
+    return max(1, -(-episodes // ((workers or os.cpu_count() or 1) * CHUNKS_PER_WORKER)))
+
+
+def run_sweep(param_sets, seeds, out, workers=None, max_frames=DEFAULT_MAX_FRAMES,
+              noise=PRESS_NOISE, chunk_size=None):
+    # Streams one CSV row per episode to `out` as chunks complete (in
+    # completion order) and returns {param set index: [(score, frames, cause), ...]}.
+    names = sorted({name for tuning in param_sets for name in tuning})
+    for tuning in param_sets:
+        Simulation(tuning=tuning)  # fail fast on unknown constants
+
+    writer = csv.writer(out)
+    writer.writerow(["set", "seed", "score", "frames", "cause"] + names)
+    seeds = list(seeds)
+    chunk_size = chunk_size or default_chunk_size(len(seeds) * len(param_sets), workers)
+    tasks = [
+        (index, tuning, chunk, max_frames, noise)
+        for index, tuning in enumerate(param_sets)
+        for chunk in chunked(seeds, chunk_size)
+    ]
+    results = defaultdict(list)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_chunk, task) for task in tasks]
+        for future in as_completed(futures):
+            rows = future.result()
+            for index, seed, score, frames, cause in rows:
+                tuning = param_sets[index]
+                writer.writerow([index, seed, score, frames, cause] + [tuning.get(n, "") for n in names])
+                results[index].append((score, frames, cause))
+            out.flush()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Ghost Run balance sweeps across all cores")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=V1,V2",
+                        help="Simulation tuning constant and values to sweep (repeatable); "
+                             "separate list values with ';'")
+    parser.add_argument("--grid", help="JSON file with a 'grid' and/or 'sets' of tuning constants")
+    parser.add_argument("--seeds", default="100", help="N or START:STOP")
+    parser.add_argument("--max-frames", type=int, default=DEFAULT_MAX_FRAMES)
+    parser.add_argument("--noise", type=float, default=PRESS_NOISE,
+                        help="chance per frame of a stray jump press")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int,
+                        help=f"seeds per task (default: episodes / ({CHUNKS_PER_WORKER} x workers))")
+    parser.add_argument("--out", default="sweep_results.csv")
+    args = parser.parse_args()
+
+    param_sets = (load_grid(args.grid) if args.grid else []) + (parse_grid(args.param) if args.param else [])
+    param_sets = param_sets or [{}]
+    seeds = parse_seeds(args.seeds)
+
+    start = time.perf_counter()
+    with open(args.out, "w", newline="") as out:
+        results = run_sweep(param_sets, seeds, out, args.workers, args.max_frames, args.noise,
+                            args.chunk_size)
+    elapsed = time.perf_counter() - start
+
+    episodes = sum(len(r) for r in results.values())
+    frames = sum(f for r in results.values() for _, f, _ in r)
+    print(f"{episodes} episodes, {frames:,} frames in {elapsed:.1f}s "
+          f"({frames / elapsed:,.0f} frames/s on {args.workers} workers) -> {args.out}")
+    for index, tuning in enumerate(param_sets):
+        runs = results[index]
+        causes = defaultdict(int)
+        for _, _, cause in runs:
+            causes[cause] += 1
+        mean_score = sum(s for s, _, _ in runs) / len(runs)
+        mean_frames = sum(f for _, f, _ in runs) / len(runs)
+        deaths = ", ".join(f"{c}={n}" for c, n in sorted(causes.items()))
+        print(f"  [{index}] {json.dumps(tuning)}: score {mean_score:.0f}, frames {mean_frames:.0f}, {deaths}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+import os
+
+# Benchmarks always run offscreen; set before pygame is imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import gc
+import json
+import statistics
+import sys
+import time
+
+import numpy as np
+
+import ghost_run_game as game_module
+from ghost_run_game import (
+    SCREEN_WIDTH, GOLD, GHOST_COLOR, Game, GameState, Simulation, Obstacle, Collectible, ParticleSystem,
+)
+
+SEED = 1234
+BASELINE_VERSION = 1
+
+
+class BenchGame(Game):
+    # Crashes are ignored so a scene keeps the same workload for every frame,
+    # and nothing is written to disk
+    def on_crash(self, obstacle):
+        pass
+
+    def save_highscore(self):
+        pass
+
+
+_game = None
+
+
+def shared_game(render_scale=1.0):
+    # One window for every scene; each scene resets it to a known state
+    global _game
+    if _game is None:
+        _game = BenchGame(seed=SEED, record_path=None)
+    if _game.render_scale != render_scale:
+        _game.set_render_scale(render_scale)
+    _game.start_game()
+    _game.crashed = False
+    return _game
+
+
+def populate(sim, obstacles, collectibles):
+    # Spread entities across (and just past) the screen in a seeded order
+    types = ["tree", "rock", "bat"]
+    for i in range(obstacles):
+        x = 250 + i * (SCREEN_WIDTH * 1.5 / max(1, obstacles))
+        sim.obstacles.append(Obstacle(x, sim.rng.choice(types), sim.difficulty_multiplier))
+    for i in range(collectibles):
+        x = 300 + i * (SCREEN_WIDTH * 1.5 / max(1, collectibles))
+        sim.collectibles.append(Collectible(x, sim.difficulty_multiplier, sim.rng))
+
+
+def scene_background():
+    game = shared_game()
+    game.state = GameState.PLAYING
+
+    def frame():
+        game.background_x -= 2
+        game.obstacle_timer += 1
+        game.draw_background()
+    return frame
+
+
+def scene_particles(part):
+    particles = ParticleSystem(rng=np.random.default_rng(SEED))
+    screen = shared_game().screen
+    # Steady state of ~3900 live particles: 130 emitted per frame, 30 frame life
+    for _ in range(40):
+        particles.emit(640, 360, GOLD, count=130, speed=6)
+        particles.update()
+
+    def update():
+        particles.emit(640, 360, GOLD, count=130, speed=6)
+        particles.update()
+
+    def draw():
+        particles.draw(screen)
+    return update if part == "update" else draw
+
+
+def scene_collisions():
+    sim = Simulation(seed=SEED)
+    populate(sim, obstacles=200, collectibles=40)
+    # Ghost parked above everything: every entity is tested, none is hit
+    sim.ghost.rect.y = -200
+
+    def frame():
+        sim.check_collisions()
+    return frame
+
+
+def scene_stress_step():
+    sim = Simulation(seed=SEED)
+    sim.on_crash = lambda obstacle: None
+    populate(sim, obstacles=100, collectibles=15)
+
+    def frame():
+        sim.step()
+        sim.crashed = False
+    return frame
+
+
+def scene_state_overlay(state, cached=False):
+    # Paused and game over keep their drawn scene between frames. The cold
+    # path drops it every frame so the entities and overlay are redrawn; the
+    # cached path keeps it and flips a button's hover state, so each frame
+    # repaints just that button.
+    game = shared_game()
+    populate(game, obstacles=12, collectibles=4)
+    game.state = state
+    button = game.resume_btn if state == GameState.PAUSED else game.restart_btn
+
+    def frame():
+        if cached:
+            button.is_hovered = not button.is_hovered
+        else:
+            game.frozen = None
+        game.draw()
+    return frame
+
+
+def scene_full_frame(score=0, obstacles=0, render_scale=1.0, burst=0):
+    # burst: particles emitted every frame, on top of the jump puffs
+    game = shared_game(render_scale)
+    game.score = score
+    game.difficulty_multiplier = 1.0 + score / Simulation.DIFFICULTY_SCORE_DIVISOR
+    populate(game, obstacles=obstacles, collectibles=obstacles // 6)
+
+    def frame():
+        if game.frames % 20 == 0:
+            game.jump()
+        game.update_playing()
+        game.crashed = False
+        if game.frames % 15 == 0:
+            game.particles.emit(game.ghost.x, game.ghost.y, GHOST_COLOR, count=30, speed=5)
+        if burst:
+            game.particles.emit(640, 360, GOLD, count=burst, speed=6)
+        game.draw()
+    return frame
+
+
+# name -> (scene factory, frames timed per repeat)
+BENCHMARKS = {
+    "draw_background": (scene_background, 120),
+    "particles_update": (lambda: scene_particles("update"), 120),
+    "particles_draw": (lambda: scene_particles("draw"), 120),
+    "collisions_200": (scene_collisions, 600),
+    "sim_step_crowded": (scene_stress_step, 60),
+    "frame_paused": (lambda: scene_state_overlay(GameState.PAUSED), 60),
+    "frame_game_over": (lambda: scene_state_overlay(GameState.GAME_OVER), 60),
+    "frame_paused_cached": (lambda: scene_state_overlay(GameState.PAUSED, cached=True), 600),
+    "frame_game_over_cached": (lambda: scene_state_overlay(GameState.GAME_OVER, cached=True), 600),
+    "frame_menu": (lambda: scene_state_overlay(GameState.MENU), 60),
+    "frame_playing": (scene_full_frame, 120),
+    "frame_high_difficulty": (lambda: scene_full_frame(score=20000, obstacles=20), 300),
+    "frame_playing_50pct": (lambda: scene_full_frame(render_scale=0.5), 120),
+    "frame_particles": (lambda: scene_full_frame(burst=130), 120),
+    "frame_particles_50pct": (lambda: scene_full_frame(render_scale=0.5, burst=130), 120),
+}
+
+
+def measure(factory, frames, repeats, warmup=1):
+    # ns per frame for each repeat; every repeat starts from a fresh scene
+    samples = []
+    for i in range(warmup + repeats):
+        step = factory()
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter_ns()
+            for _ in range(frames):
+                step()
+            elapsed = time.perf_counter_ns() - start
+        finally:
+            gc.enable()
+        if i >= warmup:
+            samples.append(elapsed / frames)
+    return samples
+
+
+def summarize(samples):
+    median = statistics.median(samples)
+    mad = statistics.median(abs(s - median) for s in samples)
+    return {"median_ns": median, "mad_ns": mad, "min_ns": min(samples)}
+
+
+def compare(results, baseline, threshold):
+    # Returns ({name: relative change}, [regressed names])
+    changes = {}
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        changes[name] = stats["median_ns"] / base["median_ns"] - 1
+        # Both the relative threshold and the measured noise must be exceeded
+        noise = 3 * max(stats["mad_ns"], base["mad_ns"])
+        if changes[name] > threshold and stats["median_ns"] - base["median_ns"] > noise:
+            regressions.append(name)
+    return changes, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ghost Run hot-path benchmarks (SDL dummy driver)")
+    parser.add_argument("names", nargs="*", help="benchmarks to run (default: all)")
+    parser.add_argument("--repeats", type=int, default=11)
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH", help="baseline JSON to check against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="allowed slowdown vs baseline median (default 0.15 = 15%%)")
+    parser.add_argument("--list", action="store_true")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+    unknown = [n for n in args.names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, "r") as f:
+            data = json.load(f)
+        if data.get("version") != BASELINE_VERSION:
+            parser.error(f"{args.compare} is not a version {BASELINE_VERSION} baseline")
+        baseline = data["results"]
+
+    results = {}
+    for name in args.names or BENCHMARKS:
+        factory, frames = BENCHMARKS[name]
+        results[name] = summarize(measure(factory, frames, args.repeats))
+
+    changes, regressions = compare(results, baseline, args.threshold)
+    print(f"{'benchmark':<24}{'median':>11}{'+/- mad':>10}{'min':>11}{'vs base':>10}")
+    for name, stats in results.items():
+        change = f"{changes[name]:+.1%}" if name in changes else ""
+        flag = "  REGRESSED" if name in regressions else ""
+        print(f"{name:<24}{stats['median_ns'] / 1e3:>9.1f}us{stats['mad_ns'] / 1e3:>8.1f}us"
+              f"{stats['min_ns'] / 1e3:>9.1f}us{change:>10}{flag}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"version": BASELINE_VERSION, "pygame": game_module.pygame.version.ver,
+                       "results": results}, f, indent=2)
+        print(f"Baseline written to {args.save_baseline}")
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed past {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+import argparse
+import os
+import sys
+import time
+
+import pygame
+
+from ghost_run_game import FrameCapture, Game, GameState, Replay
+
+
+def render(game, capture, tail):
+    # One frame per simulation tick, so the output is exactly 60 fps of
+    # game time no matter how long encoding takes
+    game.start_game()
+    while game.state == GameState.PLAYING:
+        game.update_playing()
+        game.draw()
+        capture.submit(game.window)
+        pygame.event.pump()
+    for _ in range(tail):
+        game.update_game_over()
+        game.draw()
+        capture.submit(game.window)
+        pygame.event.pump()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a Ghost Run replay to a PNG sequence or raw video offline")
+    parser.add_argument("replay", help="replay file recorded by the game")
+    parser.add_argument("out", help="output directory (png) or file (raw)")
+    parser.add_argument("--format", choices=["png", "raw"], default="png")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1)),
+                        help="encoder threads for png output (raw always uses one)")
+    parser.add_argument("--queue", type=int, default=8, help="frames buffered for the encoders")
+    parser.add_argument("--level", type=int, default=1, help="png zlib level, 0-9")
+    parser.add_argument("--tail", type=int, default=60, help="frames of the game over screen to keep")
+    parser.add_argument("--window", action="store_true", help="render in a visible window instead of headless")
+    args = parser.parse_args()
+    if not args.window:
+        # Read when Game first opens the display, not at import
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    replay = Replay.load(args.replay)
+    game = Game(playback=replay, record_path=None, quality="high")
+    # Offline renders wait for the encoders instead of dropping frames
+    capture = FrameCapture(args.out, args.format, workers=args.workers, queue_size=args.queue,
+                           block=True, level=args.level)
+    start = time.perf_counter()
+    render(game, capture, args.tail)
+    rendered = time.perf_counter() - start
+    capture.close()
+    elapsed = time.perf_counter() - start
+    print(f"Replay seed {replay.seed}: score {game.score}, {capture.frames} frames "
+          f"({capture.frames / elapsed:.0f} fps, game thread busy {rendered:.1f}s "
+          f"of which {capture.wait_ns / 1e9:.1f}s waiting on encoders)")
+    game.writer.close()
+    pygame.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+import argparse
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+from ghost_run_batch import parse_grid
+from ghost_run_game import SCREEN_WIDTH, Simulation, Ghost, Obstacle
+
+# Obstacles per sampled sequence; each sequence starts with the ghost free
+DEFAULT_LENGTH = 6
+DEFAULT_SCORES = "0:20001:2000"
+
+
+def jump_arc(jump_power, gravity):
+    # Ghost rect y for every airborne frame of one jump, from the real Ghost
+    ghost = Ghost(jump_power, gravity)
+    while not ghost.on_ground:
+        ghost.update()
+    ground_y = ghost.rect.y
+    ghost.jump()
+    arc = []
+    while True:
+        ghost.update()
+        if ghost.on_ground:
+            break
+        arc.append(ghost.rect.y)
+    # Ghost states as bits: bit 0 on the ground, bit i the i-th airborne frame
+    if len(arc) + 1 > 64:
+        raise ValueError(f"Jump arc of {len(arc)} frames does not fit the 64-bit state")
+    return ground_y, arc
+
+
+def obstacle_table(speed, ground_y, arc):
+    # blocked[type, k] = ghost state bits that collide with an obstacle of
+    # that type k frames after it spawned (the frame it spawns is k = 0)
+    ghost = Ghost()
+    ghost_left, ghost_right, ghost_height = ghost.x, ghost.x + ghost.width, ghost.height
+    heights = [ground_y] + arc
+    rows = []
+    for obstacle_type in Obstacle.TYPES:
+        obstacle = Obstacle(SCREEN_WIDTH, obstacle_type)
+        x = obstacle.x
+        row = []
+        # Repeated subtraction, exactly as Obstacle.update moves it
+        while int(x) + obstacle.width > ghost_left:
+            bits = 0
+            if int(x) < ghost_right:
+                for bit, y in enumerate(heights):
+                    if y < obstacle.y + obstacle.height and obstacle.y < y + ghost_height:
+                        bits |= 1 << bit
+            row.append(bits)
+            x -= speed
+        rows.append(row)
+    width = max(len(row) for row in rows)
+    return np.array([row + [0] * (width - len(row)) for row in rows], dtype=np.uint64)
+
+
+def gap_distribution(sim, score):
+    # step() re-draws randint(t, t + jitter) every frame and spawns once the
+    # timer passes it, so the gap k has hazard P(draw < k), not a uniform pmf
+    threshold = max(sim.SPAWN_MIN, sim.SPAWN_BASE - int(score / sim.SPAWN_SCORE_DIVISOR))
+    k = np.arange(1, threshold + sim.SPAWN_JITTER + 2)
+    hazard = np.clip((k - threshold) / (sim.SPAWN_JITTER + 1), 0.0, 1.0)
+    survival = np.concatenate(([1.0], np.cumprod(1 - hazard)[:-1]))
+    return k, hazard * survival, threshold
+
+
+class SpawnModel:
+    # Spawn sequences at a fixed score, drawn the way Simulation draws them
+    def __init__(self, tuning, score):
+        sim = Simulation(tuning=tuning, seed=0)
+        self.score = score
+        self.multiplier = 1.0 + score / sim.DIFFICULTY_SCORE_DIVISOR
+        self.speed = 8 * self.multiplier
+        self.gaps, pmf, self.threshold = gap_distribution(sim, score)
+        self.gap_cdf = np.cumsum(pmf)
+        weights = np.array(sim.LATE_OBSTACLE_WEIGHTS if score > sim.LATE_SCORE else sim.OBSTACLE_WEIGHTS,
+                           dtype=np.float64)
+        self.type_cdf = np.cumsum(weights) / weights.sum()
+        self.ground_y, self.arc = jump_arc(sim.JUMP_POWER, sim.GRAVITY)
+        self.blocked = obstacle_table(self.speed, self.ground_y, self.arc)
+        # Frames before any obstacle reaches the ghost need no solving
+        self.reach = int(np.flatnonzero(self.blocked.any(axis=0))[0]) if self.blocked.any() else self.blocked.shape[1]
+        states = len(self.arc) + 1
+        self.full = np.uint64((1 << states) - 1)
+        self.last = np.uint64(states - 1)
+
+    def sample(self, rng, count, length):
+        # (spawn frames, type codes), each (count, length)
+        gaps = self.gaps[np.searchsorted(self.gap_cdf, rng.random((count, length - 1)) * self.gap_cdf[-1])]
+        spawns = np.zeros((count, length), dtype=np.int64)
+        np.cumsum(gaps, axis=1, out=spawns[:, 1:])
+        types = np.searchsorted(self.type_cdf, rng.random((count, length)), side="right")
+        return spawns, np.minimum(types, len(Obstacle.TYPES) - 1)
+
+    def solve(self, spawns, types):
+        # Frame of the first unavoidable crash per sequence, or -1. The set of
+        # ghost states that some jump schedule can be in is a bitset, stepped
+        # frame by frame and masked by what the obstacles block.
+        count, length = spawns.shape
+        window = self.blocked.shape[1]
+        frames = int(spawns[:, -1].max()) + window
+        blocked = np.zeros((count, frames), dtype=np.uint64)
+        rows = np.arange(count)
+        for j in range(length):
+            for k in range(self.reach, window):
+                blocked[rows, spawns[:, j] + k] |= self.blocked[types[:, j], k]
+        one = np.uint64(1)
+        not_ground = self.full & ~one
+        states = np.full(count, self.full, dtype=np.uint64)
+        crash = np.full(count, -1, dtype=np.int64)
+        for frame in range(self.reach, frames):
+            # Stay grounded, jump (bit 0 -> 1), rise/fall a frame, or land
+            states = (states & one) | ((states << one) & not_ground) | ((states >> self.last) & one)
+            states &= ~blocked[:, frame]
+            crash[(states == 0) & (crash < 0)] = frame
+        return crash
+
+
+def analyze(tuning, scores, samples, length, rng, chunk=1 << 14):
+    # {score: (model, impossible count, Counter of (prev type, type, gap) at the crash)}
+    results = {}
+    for score in scores:
+        model = SpawnModel(tuning, score)
+        impossible = 0
+        causes = Counter()
+        for start in range(0, samples, chunk):
+            count = min(chunk, samples - start)
+            spawns, types = model.sample(rng, count, length)
+            crash = model.solve(spawns, types)
+            failed = np.flatnonzero(crash >= 0)
+            impossible += len(failed)
+            # Obstacle being passed at the crash, and the one before it
+            index = (spawns[failed] <= crash[failed, None]).sum(axis=1) - 1
+            for row, j in zip(failed.tolist(), index.tolist()):
+                if j > 0:
+                    gap = int(spawns[row, j] - spawns[row, j - 1])
+                    causes[(Obstacle.TYPES[types[row, j - 1]], Obstacle.TYPES[types[row, j]], gap)] += 1
+        results[score] = (model, impossible, causes)
+    return results
+
+
+def parse_scores(spec):
+    # "0:20001:2000" (range) or "0,500,5000"
+    if ":" in spec:
+        return list(range(*(int(v) for v in spec.split(":"))))
+    return [int(v) for v in spec.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate how often spawn sequences are impossible to survive")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=V1,V2",
+                        help="Simulation tuning constant and values to analyze (repeatable)")
+    parser.add_argument("--scores", default=DEFAULT_SCORES, help="START:STOP:STEP or a comma list")
+    parser.add_argument("--samples", type=int, default=200_000, help="sequences per score")
+    parser.add_argument("--length", type=int, default=DEFAULT_LENGTH, help="obstacles per sequence")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-rate", type=float, metavar="P",
+                        help="fail (exit 1) if any score's impossible rate per 100 spawns exceeds P")
+    args = parser.parse_args()
+    if args.length < 2:
+        parser.error("--length must be at least 2")
+
+    param_sets = parse_grid(args.param) if args.param else [{}]
+    scores = parse_scores(args.scores)
+    rng = np.random.default_rng(args.seed)
+    failed = []
+    for tuning in param_sets:
+        start = time.perf_counter()
+        results = analyze(tuning, scores, args.samples, args.length, rng)
+        elapsed = time.perf_counter() - start
+        total = len(scores) * args.samples
+        print(f"{tuning or 'default tuning'}: {total:,} sequences of {args.length} obstacles "
+              f"in {elapsed:.1f}s")
+        print(f"{'score':>7}{'speed':>7}{'gap':>9}{'P(impossible)':>16}{'per 100':>10}  most common")
+        for score, (model, impossible, causes) in results.items():
+            p = impossible / args.samples
+            error = (p * (1 - p) / args.samples) ** 0.5
+            # Each sequence after the first obstacle is (length - 1) new spawns
+            per_100 = 100 * -np.log1p(-min(p, 1 - 1e-12)) / (args.length - 1)
+            common = ", ".join(f"{a}->{b} @{gap}f" for (a, b, gap), _ in causes.most_common(2))
+            gaps = f"{model.threshold + 1}-{model.gaps[-1]}"
+            print(f"{score:>7}{model.speed:>7.2f}{gaps:>9}{p:>10.2e}±{error:.0e}{per_100:>10.4f}  {common}")
+            if args.max_rate is not None and per_100 > args.max_rate:
+                failed.append((tuning, score, per_100))
+    if failed:
+        for tuning, score, per_100 in failed:
+            print(f"FAIL {tuning or 'default tuning'} at score {score}: {per_100:.4f} per 100 spawns "
+                  f"> {args.max_rate}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,25 @@
+import time
+# Taken before the heavy imports so --startup-report can include them
+IMPORT_START = time.perf_counter()
 import pygame
 import random
 import sys
 import os
 import json
 import math
+import struct
+import argparse
+import csv
+import gc
+import hashlib
+import threading
+import queue
+import zlib
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, deque
 from enum import Enum
 
-# Initialize Pygame
-pygame.init()
-pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
-
 # Constants
 SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
@@ -29,6 +38,30 @@ GRAY = (128, 128, 128)
 GHOST_COLOR = (220, 220, 255)
 GLOW_COLOR = (255, 255, 150)
 
+# Subsystems are brought up on first use rather than at import, so tools
+# that only simulate never touch video or audio
+def init_display():
+    if not pygame.display.get_init():
+        pygame.display.init()
+    if not pygame.font.get_init():
+        pygame.font.init()
+        # Fonts from before a pygame.quit() point at freed memory; drop them
+        # and every text surface keyed by them
+        _fonts.clear()
+        text_cache.surfaces.clear()
+
+def init_audio():
+    # Returns whether the mixer is usable
+    if pygame.mixer.get_init():
+        return True
+    try:
+        pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+    except pygame.error as e:
+        # No audio device (servers, CI); Game falls back to silent mode
+        print(f"Mixer unavailable: {e}")
+        return False
+    return True
+
 # Game States
 class GameState(Enum):
     MENU = 1
@@ -37,8 +70,164 @@ class GameState(Enum):
     PAUSED = 4
 
 class Synthesizer:
+    # Sounds are described as scores: a bpm, a length in beats and layers of
+    # notes [start_beat, beats, freq] (optionally a 4th slide-to freq). Each
+    # layer picks a waveform, an envelope and a volume. SFX use bpm 60 so a
+    # beat is a second. Scores are plain JSON data, which is what AudioCache
+    # hashes.
+    # Bump whenever rendering changes so stale cached PCM is ignored
+    VERSION = 2
+    TABLE_SIZE = 4096
+    BLOCK = 1 << 16
+    JUMP = {
+        "bpm": 60, "beats": 0.3,
+        # Sliding frequency 300 -> 600
+        "layers": [{"wave": "sine", "envelope": "flat", "volume": 0.3, "notes": [[0, 0.3, 300, 600]]}],
+    }
+    COLLECT = {
+        # High ping, sharp fade
+        "bpm": 60, "beats": 0.15,
+        "layers": [{"wave": "sine", "envelope": "linear", "volume": 0.2, "notes": [[0, 0.15, 1200]]}],
+    }
+    MUSIC = {
+        # Simple ambient arpeggio (A minor ish) with a bass note every 4 beats
+        "bpm": 120, "beats": 8,
+        "layers": [
+            {"wave": "sine", "envelope": "linear", "volume": 0.1,
+             "notes": [[i, 1, f] for i, f in enumerate([220, 261, 329, 392, 440, 392, 329, 261])]},
+            {"wave": "sine", "envelope": "flat", "volume": 0.15, "notes": [[0, 1, 110], [4, 1, 220]]},
+        ],
+    }
+    WAVES = ("sine", "square", "triangle", "saw")
+    ENVELOPES = ("flat", "linear", "exp", "pluck")
+    _tables = None
+
     def __init__(self):
         self.sample_rate = 44100
+
+    @classmethod
+    def tables(cls):
+        # One cycle per waveform and one 0..1 sweep per envelope, built once
+        # and flattened so a single gather serves every layer. Each row has
+        # TABLE_SIZE + 1 points; slopes hold the per-step deltas for linear
+        # interpolation.
+        if cls._tables is None:
+            x = np.linspace(0, 1, cls.TABLE_SIZE + 1)
+            waves = np.stack([
+                np.sin(2 * np.pi * x),
+                np.where(x < 0.5, 1.0, -1.0),
+                1 - 4 * np.abs(((x + 0.25) % 1) - 0.5),
+                2 * ((x + 0.5) % 1) - 1,
+            ])
+            envelopes = np.stack([
+                np.ones_like(x),
+                1 - x,
+                np.exp(-5 * x),
+                np.minimum(x / 0.02, 1) * np.exp(-4 * x),
+            ])
+            cls._tables = tuple(
+                (table.ravel(), np.append(np.diff(table, axis=1), np.zeros((len(table), 1)), axis=1).ravel())
+                for table in (waves, envelopes)
+            )
+        return cls._tables
+
+    def lookup(self, table, base, pos):
+        # Linear interpolation at fractional positions 0..TABLE_SIZE into the
+        # table rows starting at the flat offsets in base
+        values, slopes = table
+        index = pos.astype(np.int64)
+        frac = pos - index
+        index += base
+        return values[index] + slopes[index] * frac
+
+    def render_score(self, score):
+        sr = self.sample_rate
+        beat = 60 / score["bpm"]
+        row = self.TABLE_SIZE + 1
+        notes = []
+        for layer in score["layers"]:
+            wave = self.WAVES.index(layer.get("wave", "sine")) * row
+            envelope = self.ENVELOPES.index(layer.get("envelope", "flat")) * row
+            volume = layer.get("volume", 1.0)
+            for note in layer["notes"]:
+                notes.append((
+                    int(sr * note[0] * beat),
+                    int(sr * note[1] * beat),
+                    note[2],
+                    note[3] if len(note) > 3 else note[2],
+                    volume * (note[4] if len(note) > 4 else 1.0),
+                    wave,
+                    envelope,
+                ))
+
+        total = int(sr * score["beats"] * beat)
+        out = np.zeros(total, dtype=np.float64)
+        # Sorted by start so blocks cover contiguous stretches of output
+        notes = sorted(n for n in notes if n[1] > 0 and n[0] < total)
+        if not notes:
+            return self.to_pcm(out)
+        starts, lengths, f0, f1, gains, waves, envelopes = (np.array(v) for v in zip(*notes))
+
+        # Notes are rendered a block at a time (whole notes, ~BLOCK samples)
+        # so the temporaries stay cache sized on long scores
+        ends = np.cumsum(lengths)
+        cuts = np.searchsorted(ends, np.arange(self.BLOCK, ends[-1], self.BLOCK), side="right")
+        edges = np.unique(np.concatenate(([0], cuts, [len(notes)])))
+        for a, b in zip(edges[:-1], edges[1:]):
+            self.render_block(out, starts[a:b], lengths[a:b], f0[a:b], f1[a:b],
+                              gains[a:b], waves[a:b], envelopes[a:b])
+        return self.to_pcm(out)
+
+    def render_block(self, out, starts, lengths, f0, f1, gains, waves, envelopes):
+        # Every sample of every note in one flat batch; per-note values are
+        # expanded with np.repeat. k counts samples into the note, u is the
+        # 0..1 progress through it.
+        per_sample = lambda values: np.repeat(values, lengths)
+        k = np.arange(lengths.sum(), dtype=np.float64)
+        k -= per_sample((np.cumsum(lengths) - lengths).astype(np.float64))
+        u = k * per_sample(1.0 / np.maximum(lengths - 1, 1))
+
+        # Slides ramp the frequency over the note as f(k) * t, like the
+        # original jump sound
+        freq = per_sample(f0 * (self.TABLE_SIZE / self.sample_rate))
+        if np.any(f1 != f0):
+            freq += per_sample((f1 - f0) * (self.TABLE_SIZE / self.sample_rate)) * u
+        # Phase in table steps; TABLE_SIZE is a power of two so the integer
+        # part wraps with a mask instead of np.mod
+        phase = freq * k
+        index = phase.astype(np.int64)
+        phase -= index
+        index &= self.TABLE_SIZE - 1
+
+        wave_values, wave_slopes = self.tables()[0]
+        index += per_sample(waves)
+        value = wave_slopes[index]
+        value *= phase
+        value += wave_values[index]
+        u *= self.TABLE_SIZE
+        value *= self.lookup(self.tables()[1], per_sample(envelopes), u)
+        value *= per_sample(gains.astype(np.float64))
+
+        index = per_sample(starts)
+        index += k.astype(np.int64)
+        if index.max() >= len(out):
+            # Notes running past the end of the score are cut off
+            keep = index < len(out)
+            index, value = index[keep], value[keep]
+        if np.all(starts[1:] >= (starts + lengths)[:-1]):
+            # No two notes overlap, so every index is unique
+            out[index] += value
+        else:
+            np.add.at(out, index, value)
+
+    def to_pcm(self, wave):
+        # Mono float wave -> contiguous stereo int16, the mixer's format
+        wave = np.clip(wave, -1.0, 1.0)
+        stereo = np.column_stack((wave, wave))
+        return (stereo * 32767).astype(np.int16)
+
+    def make_sound(self, pcm):
+        return pygame.sndarray.make_sound(np.ascontiguousarray(pcm))
         
     def generate_wave(self, func, duration, frequency, volume=0.5):
         n_samples = int(self.sample_rate * duration)
@@ -47,137 +236,419 @@ class Synthesizer:
         # Apply simple fade out
         envelope = np.exp(-3 * t)
         wave = wave * envelope
-        
-        # Stereo duplication and contiguous check
-        stereo = np.column_stack((wave, wave))
-        
-        # Convert to 16-bit integer
-        audio = (stereo * 32767).astype(np.int16)
-        return pygame.sndarray.make_sound(audio)
+        return self.make_sound(self.to_pcm(wave))
 
     def generate_jump_sound(self):
-        duration = 0.3
-        n_samples = int(self.sample_rate * duration)
-        t = np.linspace(0, duration, n_samples, False)
-        # Sliding frequency 300 -> 600
-        freq = np.linspace(300, 600, n_samples)
-        wave = np.sin(2 * np.pi * freq * t) * 0.3
-        
-        stereo = np.column_stack((wave, wave))
-        audio = (stereo * 32767).astype(np.int16)
-        return pygame.sndarray.make_sound(audio)
+        return self.make_sound(self.render_score(self.JUMP))
 
     def generate_collect_sound(self):
-        # High ping
-        duration = 0.15
-        n_samples = int(self.sample_rate * duration)
-        t = np.linspace(0, duration, n_samples, False)
-        wave = np.sin(2 * np.pi * 1200 * t) * 0.2
-        # Sharp fade
-        envelope = np.linspace(1, 0, n_samples)
-        wave = wave * envelope
-        
-        stereo = np.column_stack((wave, wave))
-        audio = (stereo * 32767).astype(np.int16)
-        return pygame.sndarray.make_sound(audio)
+        return self.make_sound(self.render_score(self.COLLECT))
 
     def generate_music_loop(self):
-        # Simple ambient arpeggio
-        bpm = 120
-        duration_per_beat = 60 / bpm
-        total_beats = 8
-        total_duration = duration_per_beat * total_beats
-        n_samples = int(self.sample_rate * total_duration)
-        full_buffer = np.zeros(n_samples, dtype=np.float32)
-        
-        notes = [220, 261, 329, 392, 440, 392, 329, 261] # A minor ish
-        
-        beat_samples = int(self.sample_rate * duration_per_beat)
-        
-        for i, freq in enumerate(notes):
-            t = np.linspace(0, duration_per_beat, beat_samples, False)
-            wave = np.sin(2 * np.pi * freq * t) * 0.1
-            # Envelope
-            env = np.linspace(1, 0, beat_samples)
-            
-            start = i * beat_samples
-            end = start + beat_samples
-            full_buffer[start:end] += wave * env
-            
-            # Add a bass note every 4 beats
-            if i % 4 == 0:
-                bass_wave = np.sin(2 * np.pi * (freq/2) * t) * 0.15
-                full_buffer[start:end] += bass_wave
-        
-        stereo = np.column_stack((full_buffer, full_buffer))
-        audio = (stereo * 32767).astype(np.int16)
-        return pygame.sndarray.make_sound(audio)
-
-class Particle:
-    def __init__(self, x, y, color, speed, size, life):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.vx = random.uniform(-speed, speed)
-        self.vy = random.uniform(-speed, speed)
-        self.size = size
-        self.life = life
-        self.original_life = life
+        return self.make_sound(self.render_score(self.MUSIC))
 
-    def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.life -= 1
-        self.size = max(0, self.size * 0.95)
+    def render_all(self, cache=None):
+        # Returns ({name: int16 PCM}, cache hits). Pure NumPy, so it can run
+        # on a worker thread; Sounds are made on the main thread afterwards.
+        buffers = {}
+        hits = 0
+        for name, score in (("jump", self.JUMP), ("collect", self.COLLECT), ("music", self.MUSIC)):
+            if cache is None:
+                buffers[name] = self.render_score(score)
+                continue
+            key = cache.key(name, score, self.sample_rate, self.VERSION)
+            pcm = cache.load(key)
+            if pcm is None:
+                pcm = self.render_score(score)
+                cache.store(key, pcm)
+            else:
+                hits += 1
+            buffers[name] = pcm
+        return buffers, hits
 
-    def draw(self, screen):
-        if self.life > 0:
-            alpha = int((self.life / self.original_life) * 255)
-            s = pygame.Surface((int(self.size * 2), int(self.size * 2)), pygame.SRCALPHA)
-            pygame.draw.circle(s, (*self.color, alpha), (int(self.size), int(self.size)), int(self.size))
-            screen.blit(s, (int(self.x - self.size), int(self.y - self.size)))
+class AudioCache:
+    # Rendered PCM on disk as .npy, keyed by a hash of the generator
+    # parameters, sample rate and Synthesizer.VERSION; read back memory-mapped
+    def __init__(self, directory="audio_cache"):
+        self.directory = directory
+
+    def key(self, name, params, sample_rate, version):
+        blob = json.dumps([name, params, sample_rate, version], sort_keys=True)
+        return f"{name}-{hashlib.sha256(blob.encode()).hexdigest()[:16]}"
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".npy")
+
+    def load(self, key):
+        try:
+            return np.load(self.path(key), mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+
+    def store(self, key, pcm):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write then rename so a crash never leaves a truncated entry
+            tmp = self.path(key) + ".tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, pcm)
+            os.replace(tmp, self.path(key))
+        except OSError as e:
+            print(f"Audio cache write failed: {e}")
+
+class MusicStream:
+    # Endless procedural music, synthesized a beat at a time on a background
+    # thread and handed to a mixer channel's one-sound queue from the game
+    # loop. At most BUFFER beats wait in between, so memory stays the same
+    # however long a session runs; tempo and arrangement follow the
+    # difficulty with that many beats of delay.
+    BUFFER = 4
+    BEATS_PER_BAR = 4
+    BASE_BPM = 120
+    MAX_BPM = 160
+    # Difficulty multiplier above 1.0 at which the music is at full intensity
+    FULL_INTENSITY = 2.0
+    # Am, F, C, G; one chord per bar as four tones low to high
+    PROGRESSION = (
+        (220, 261, 329, 392),
+        (174.6, 220, 261, 349.2),
+        (261, 329, 392, 523.3),
+        (196, 246.9, 293.7, 392),
+    )
+    # Order the chord tones are arpeggiated in, picked per bar
+    PATTERNS = ((0, 1, 2, 3), (0, 2, 1, 3), (3, 2, 1, 0), (0, 1, 2, 1), (0, 2, 3, 2))
+
+    def __init__(self, synth, channel):
+        self.synth = synth
+        self.channel = channel
+        self.rng = random.Random()
+        self.buffer = queue.Queue(self.BUFFER)
+        # Written by the game loop, read by the worker
+        self.level = 0.0
+        self.generation = 0
+        self.playing = False
+        self.started = False
+        self.closed = False
+        # Worker-side position in the piece
+        self.rendered_generation = 0
+        self.beat = 0
+        self.bar = 0
+        self.pattern = self.PATTERNS[0]
+        self.octave = 1
+        self.beats = 0
+        self.underruns = 0
+        self.thread = threading.Thread(target=self.work, name="music", daemon=True)
+        self.thread.start()
+
+    def next_score(self):
+        # One beat as a Synthesizer score. Eighth notes come in at a third
+        # intensity and off-beat ticks at two thirds.
+        if self.rendered_generation != self.generation:
+            self.rendered_generation = self.generation
+            self.beat = self.bar = 0
+        if self.beat == 0:
+            self.pattern = self.rng.choice(self.PATTERNS)
+            self.octave = 2 if self.rng.random() < 0.2 else 1
+        level = self.level
+        chord = self.PROGRESSION[self.bar % len(self.PROGRESSION)]
+        tone = chord[self.pattern[self.beat]] * self.octave
+        if level < 1 / 3:
+            arpeggio = [[0, 1, tone]]
+        else:
+            after = chord[self.pattern[(self.beat + 2) % self.BEATS_PER_BAR]] * self.octave
+            arpeggio = [[0, 0.5, tone], [0.5, 0.5, after]]
+        layers = [{"wave": "sine", "envelope": "linear", "volume": 0.1, "notes": arpeggio}]
+        if self.beat == 0:
+            layers.append({"wave": "sine", "envelope": "flat", "volume": 0.15, "notes": [[0, 1, chord[0] / 2]]})
+        if level >= 2 / 3:
+            layers.append({"wave": "saw", "envelope": "pluck", "volume": 0.03, "notes": [[0.5, 0.25, 3520]]})
+        self.beat += 1
+        if self.beat == self.BEATS_PER_BAR:
+            self.beat = 0
+            self.bar += 1
+        return {"bpm": self.BASE_BPM + (self.MAX_BPM - self.BASE_BPM) * level, "beats": 1, "layers": layers}
+
+    def work(self):
+        while not self.closed:
+            generation = self.generation
+            pcm = self.synth.render_score(self.next_score())
+            while not self.closed:
+                try:
+                    self.buffer.put((generation, pcm), timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+    def feed(self, difficulty_multiplier):
+        # Called every frame; tops up the channel's queue slot once the beat
+        # queued there has started playing
+        self.level = min(max(difficulty_multiplier - 1.0, 0.0) / self.FULL_INTENSITY, 1.0)
+        if not self.playing or self.channel.get_queue() is not None:
+            return
+        while True:
+            try:
+                generation, pcm = self.buffer.get_nowait()
+            except queue.Empty:
+                return
+            # Beats rendered before the last play() belong to the old run
+            if generation == self.generation:
+                break
+        sound = self.synth.make_sound(pcm)
+        if self.channel.get_busy():
+            self.channel.queue(sound)
+        else:
+            # Ran dry: there was a gap since the previous beat
+            if self.started:
+                self.underruns += 1
+            self.channel.play(sound)
+            self.started = True
+        self.beats += 1
+
+    def play(self):
+        # From the first beat at the lowest intensity
+        self.generation += 1
+        self.level = 0.0
+        self.playing = True
+        self.started = False
+        self.feed(1.0)
+
+    def stop(self):
+        self.playing = False
+        self.generation += 1
+        self.channel.stop()
+
+    def stats(self):
+        return f"music: {self.beats} beats, {self.buffer.qsize()}/{self.BUFFER} buffered, {self.underruns} underruns"
+
+    def close(self, timeout=1.0):
+        self.closed = True
+        self.thread.join(timeout)
 
 class ParticleSystem:
-    def __init__(self):
-        self.particles = []
+    # Struct-of-arrays storage with a fixed capacity; emits past it are dropped
+    CAPACITY = 4096
+    SIZE_DECAY = 0.95
+    ALPHA_LEVELS = 16
+
+    def __init__(self, capacity=CAPACITY, rng=None):
+        self.capacity = capacity
+        self.count = 0
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.int32)
+        self.original_life = np.ones(capacity, dtype=np.int32)
+        self.color = np.zeros(capacity, dtype=np.int16)
+        self.palette = []
+        self.palette_index = {}
+        # Fraction of each emit actually spawned; lowered by QualityGovernor
+        self.density = 1.0
+        # (color index, radius, alpha level) -> pre-rendered disc
+        self.sprites = {}
+
+    def __len__(self):
+        return self.count
+
+    def color_id(self, color):
+        color = tuple(color[:3])
+        index = self.palette_index.get(color)
+        if index is None:
+            index = len(self.palette)
+            self.palette.append(color)
+            self.palette_index[color] = index
+        return index
 
     def emit(self, x, y, color, count=10, speed=2, size=5, life=30):
-        for _ in range(count):
-            self.particles.append(Particle(x, y, color, speed, size, life))
+        if self.density != 1.0 and count > 0:
+            # A reduced emit still shows at least one particle
+            count = max(1, round(count * self.density))
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return
+        start = self.count
+        end = start + count
+        self.pos[start:end] = (x, y)
+        self.vel[start:end] = self.rng.uniform(-speed, speed, (count, 2))
+        self.size[start:end] = size
+        self.life[start:end] = life
+        self.original_life[start:end] = max(1, life)
+        self.color[start:end] = self.color_id(color)
+        self.count = end
 
     def update(self):
-        self.particles = [p for p in self.particles if p.life > 0]
-        for p in self.particles:
-            p.update()
+        n = self.count
+        if n == 0:
+            return
+        self.pos[:n] += self.vel[:n]
+        self.life[:n] -= 1
+        self.size[:n] *= self.SIZE_DECAY
+
+        alive = self.life[:n] > 0
+        if alive.all():
+            return
+        # Compact survivors to the front of every array
+        keep = np.flatnonzero(alive)
+        m = len(keep)
+        for array in (self.pos, self.vel, self.size, self.life, self.original_life, self.color):
+            array[:m] = array[keep]
+        self.count = m
+
+    def get_sprite(self, color_index, radius, level):
+        key = (color_index, radius, level)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            alpha = min(255, (level + 1) * 256 // self.ALPHA_LEVELS)
+            sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, (*self.palette[color_index], alpha), (radius, radius), radius)
+            self.sprites[key] = sprite
+        return sprite
 
     def draw(self, screen):
-        for p in self.particles:
-            p.draw(screen)
+        n = self.count
+        if n == 0:
+            return
+        size = self.size[:n]
+        pos = self.pos[:n]
+        scale = screen.get_height() / SCREEN_HEIGHT
+        if scale != 1.0:
+            size = size * scale
+            pos = pos * scale
+        radius = size.astype(np.int32)
+        levels = self.life[:n] * self.ALPHA_LEVELS // (self.original_life[:n] + 1)
+        xs = (pos[:, 0] - size).astype(np.int32)
+        ys = (pos[:, 1] - size).astype(np.int32)
+        visible = np.flatnonzero(radius > 0)
+        get_sprite = self.get_sprite
+        screen.blits([
+            (get_sprite(c, r, l), (x, y))
+            for c, r, l, x, y in zip(
+                self.color[visible].tolist(), radius[visible].tolist(), levels[visible].tolist(),
+                xs[visible].tolist(), ys[visible].tolist())
+        ], doreturn=False)
+
+class TextCache:
+    # Rendered text surfaces keyed by (font, text, color, antialias), LRU-evicted
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+text_cache = TextCache()
+
+_fonts = {}
+
+def scaled_font(size, scale=1.0):
+    # The default font at size * scale pixels, one object per pixel size so
+    # text_cache keys stay stable
+    pixels = max(1, round(size * scale))
+    font = _fonts.get(pixels)
+    if font is None:
+        font = _fonts[pixels] = pygame.font.Font(None, pixels)
+    return font
 
 class Button:
     def __init__(self, x, y, width, height, text, color, hover_color, action=None, font_size=40):
         self.rect = pygame.Rect(x, y, width, height)
-        self.text = text
-        self.color = color
-        self.hover_color = hover_color
+        self._text = text
+        self._color = color
+        self._hover_color = hover_color
         self.action = action
+        self.font_size = font_size
         self.font = pygame.font.Font(None, font_size)
         self.is_hovered = False
+        # Pre-rendered button (shadow, face, border, label) per (hover state,
+        # render scale). rect stays in SCREEN_WIDTH x SCREEN_HEIGHT
+        # coordinates, which is also what update() hit-tests against.
+        self.faces = {}
+
+    # Changing the label or colors drops the rendered faces; setting the
+    # same value again (update_playing does this every frame) keeps them.
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, value):
+        if value != self._text:
+            self._text = value
+            self.faces.clear()
+
+    @property
+    def color(self):
+        return self._color
+
+    @color.setter
+    def color(self, value):
+        if value != self._color:
+            self._color = value
+            self.faces.clear()
+
+    @property
+    def hover_color(self):
+        return self._hover_color
+
+    @hover_color.setter
+    def hover_color(self, value):
+        if value != self._hover_color:
+            self._hover_color = value
+            self.faces.clear()
 
     def update(self, mouse_pos):
         self.is_hovered = self.rect.collidepoint(mouse_pos)
 
-    def draw(self, screen):
-        color = self.hover_color if self.is_hovered else self.color
+    def render_face(self, hovered, scale=1.0):
+        width, height = round(self.rect.width * scale), round(self.rect.height * scale)
+        shadow, radius = round(4 * scale), round(12 * scale)
+        face = pygame.Surface((width + shadow, height + shadow), pygame.SRCALPHA)
+        color = self.hover_color if hovered else self.color
         # Draw shadow
-        pygame.draw.rect(screen, (0, 0, 0, 100), (self.rect.x + 4, self.rect.y + 4, self.rect.width, self.rect.height), border_radius=12)
+        pygame.draw.rect(face, BLACK, (shadow, shadow, width, height), border_radius=radius)
         # Draw button
-        pygame.draw.rect(screen, color, self.rect, border_radius=12)
-        pygame.draw.rect(screen, WHITE, self.rect, 2, border_radius=12)
-        
-        text_surf = self.font.render(self.text, True, WHITE)
-        text_rect = text_surf.get_rect(center=self.rect.center)
-        screen.blit(text_surf, text_rect)
+        pygame.draw.rect(face, color, (0, 0, width, height), border_radius=radius)
+        pygame.draw.rect(face, WHITE, (0, 0, width, height), max(1, round(2 * scale)), border_radius=radius)
+
+        font = self.font if scale == 1.0 else scaled_font(self.font_size, scale)
+        text_surf = text_cache.render(font, self.text, WHITE)
+        text_rect = text_surf.get_rect(center=(width // 2, height // 2))
+        face.blit(text_surf, text_rect)
+        if pygame.display.get_surface() is not None:
+            face = face.convert_alpha()
+        return face
+
+    def look(self):
+        # Everything that decides the drawn face
+        return bool(self.is_hovered), self._text, self._color, self._hover_color
+
+    def face(self, scale=1.0):
+        key = (bool(self.is_hovered), scale)
+        face = self.faces.get(key)
+        if face is None:
+            face = self.faces[key] = self.render_face(*key)
+        return face
+
+    def area(self, scale=1.0):
+        # Rect covered by the face on a surface drawn at scale, shadow included
+        return self.face(scale).get_rect(topleft=(round(self.rect.x * scale), round(self.rect.y * scale)))
+
+    def draw(self, screen):
+        scale = screen.get_height() / SCREEN_HEIGHT
+        screen.blit(self.face(scale), (round(self.rect.x * scale), round(self.rect.y * scale)))
 
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN:
@@ -186,20 +657,28 @@ class Button:
                     self.action()
 
 class Ghost:
-    def __init__(self):
+    JUMP_POWER = -22
+    GRAVITY = 1.2
+    TAIL_FRAMES = 24
+    GLOW_OFFSET = (18, 12)
+
+    def __init__(self, jump_power=JUMP_POWER, gravity=GRAVITY):
         self.x = 150
         self.y = SCREEN_HEIGHT // 2
+        # Position at the previous tick, for interpolated drawing
+        self.prev_y = self.y
         self.width = 44
         self.height = 44
         self.vel_y = 0
-        self.jump_power = -22
-        self.gravity = 1.2
+        self.jump_power = jump_power
+        self.gravity = gravity
         self.on_ground = False
         self.float_offset = 0
         self.float_speed = 0.15
         self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
         
     def update(self):
+        self.prev_y = self.y
         if not self.on_ground:
             self.vel_y += self.gravity
         
@@ -223,43 +702,61 @@ class Ghost:
             return True
         return False
     
-    def draw(self, screen):
-        draw_y = self.y + math.sin(self.float_offset) * 5
-        
-        # Ghost Body (Glow)
-        s = pygame.Surface((80, 80), pygame.SRCALPHA)
-        pygame.draw.circle(s, (*GHOST_COLOR, 80), (40, 40), 30)
-        screen.blit(s, (self.x - 18, draw_y - 12))
-        
-        # Main Body
-        head_rect = pygame.Rect(self.x, draw_y, self.width, self.height - 10)
-        pygame.draw.circle(screen, GHOST_COLOR, (int(self.x + self.width // 2), int(draw_y + self.width // 2)), self.width // 2)
-        
-        # Tail
+    @staticmethod
+    def render_frame(frame, glow=True):
+        # Glow plus body for one tail phase; body sits at (GLOW_OFFSET) in the sprite
+        sprite = pygame.Surface((80, 80), pygame.SRCALPHA)
+        if glow:
+            pygame.draw.circle(sprite, (*GHOST_COLOR, 80), (40, 40), 30)
+        x, y = Ghost.GLOW_OFFSET
+        width, height = 44, 44
+        pygame.draw.circle(sprite, GHOST_COLOR, (x + width // 2, y + width // 2), width // 2)
+
+        phase = frame * 2 * math.pi / Ghost.TAIL_FRAMES
         tail_points = []
         for i in range(5):
-            tx = self.x + (i * self.width // 4)
-            ty = draw_y + self.height - 5 + math.sin(self.float_offset * 0.5 + i) * 8
+            tx = x + (i * width // 4)
+            ty = y + height - 5 + math.sin(phase + i) * 8
             tail_points.append((tx, ty))
-        
-        # Draw tail polygon
-        points = [(self.x, draw_y + self.width//2)] + tail_points + [(self.x + self.width, draw_y + self.width//2)]
-        if len(points) > 2:
-            pygame.draw.polygon(screen, GHOST_COLOR, points)
-            
+        points = [(x, y + width // 2)] + tail_points + [(x + width, y + width // 2)]
+        pygame.draw.polygon(sprite, GHOST_COLOR, points)
+
         # Face
-        eye_y = draw_y + 15
-        pygame.draw.ellipse(screen, BLACK, (self.x + 8, eye_y, 10, 14))
-        pygame.draw.ellipse(screen, BLACK, (self.x + 28, eye_y, 10, 14))
-        pygame.draw.circle(screen, WHITE, (self.x + 10, int(eye_y + 4)), 3)
-        pygame.draw.circle(screen, WHITE, (self.x + 30, int(eye_y + 4)), 3)
+        eye_y = y + 15
+        pygame.draw.ellipse(sprite, BLACK, (x + 8, eye_y, 10, 14))
+        pygame.draw.ellipse(sprite, BLACK, (x + 28, eye_y, 10, 14))
+        pygame.draw.circle(sprite, WHITE, (x + 10, eye_y + 4), 3)
+        pygame.draw.circle(sprite, WHITE, (x + 30, eye_y + 4), 3)
+        return sprite
+
+    def draw(self, screen, alpha=1.0, glow=True):
+        # alpha blends from the previous tick's position (0) to the current one (1).
+        # Targets smaller than the screen get scaled sprites and positions.
+        scale = screen.get_height() / SCREEN_HEIGHT
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        draw_y = y + math.sin(self.float_offset) * 5
+        phase = (self.float_offset * 0.5) % (2 * math.pi)
+        frame = int(phase * self.TAIL_FRAMES / (2 * math.pi)) % self.TAIL_FRAMES
+        sprite = sprite_cache.get(("ghost", frame, glow), lambda: Ghost.render_frame(frame, glow), scale)
+        screen.blit(sprite, (int((self.x - self.GLOW_OFFSET[0]) * scale), int((draw_y - self.GLOW_OFFSET[1]) * scale)))
 
 class Obstacle:
+    __slots__ = ("x", "prev_x", "y", "type", "speed", "passed", "width", "height", "color", "wing_flap", "rect")
+    BAT_FRAMES = 16
+    # Spawn order; also the type codes used by Snapshot
+    TYPES = ("tree", "rock", "bat")
+
     def __init__(self, x, obstacle_type, speed_multiplier=1.0):
-        self.x = x
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.reset(x, obstacle_type, speed_multiplier)
+
+    def reset(self, x, obstacle_type, speed_multiplier=1.0):
+        # Also called by EntityPool to recycle a despawned obstacle
+        self.x = self.prev_x = x
         self.type = obstacle_type
         self.speed = 8 * speed_multiplier
         self.passed = False
+        self.wing_flap = 0
         
         if obstacle_type == "tree":
             self.width = 40
@@ -276,108 +773,1241 @@ class Obstacle:
             self.height = 30
             self.y = SCREEN_HEIGHT - 220
             self.color = PURPLE
-            self.wing_flap = 0
+        self.rect.update(self.x, self.y, self.width, self.height)
 
     def update(self):
+        self.prev_x = self.x
         self.x -= self.speed
+        # int() truncates like Rect(x, ...) does; assigning a float rounds
+        self.rect.x = int(self.x)
         if self.type == "bat":
             self.wing_flap += 0.4
     
-    def draw(self, screen):
-        if self.type == "tree":
-            pygame.draw.rect(screen, (80, 50, 20), (self.x + 12, self.y + 40, 16, 50))
-            pygame.draw.polygon(screen, self.color, [
-                (self.x + 20, self.y),
-                (self.x, self.y + 60),
-                (self.x + 40, self.y + 60)
-            ])
-            pygame.draw.polygon(screen, (40, 180, 40), [
-                 (self.x + 20, self.y - 20),
-                 (self.x + 5, self.y + 30),
-                 (self.x + 35, self.y + 30)
-            ])
-        elif self.type == "rock":
-            pygame.draw.circle(screen, self.color, (int(self.x + 25), int(self.y + 20)), 20)
-            pygame.draw.circle(screen, (100, 100, 100), (int(self.x + 15), int(self.y + 15)), 8)
-        elif self.type == "bat":
-            body_y = self.y + math.sin(self.wing_flap) * 10
-            wing_y = body_y - math.cos(self.wing_flap) * 15
-            pygame.draw.polygon(screen, self.color, [
-                (self.x + 20, body_y), (self.x - 5, wing_y), (self.x + 15, body_y + 10) 
-            ])
-            pygame.draw.polygon(screen, self.color, [
-                (self.x + 20, body_y), (self.x + 45, wing_y), (self.x + 25, body_y + 10)
-            ])
-            pygame.draw.circle(screen, (50, 20, 50), (int(self.x + 20), int(body_y)), 10)
-            pygame.draw.circle(screen, RED, (int(self.x + 17), int(body_y - 2)), 2)
-            pygame.draw.circle(screen, RED, (int(self.x + 23), int(body_y - 2)), 2)
+    @staticmethod
+    def render_sprite(obstacle_type, frame=0):
+        # Returns (sprite, offset of the obstacle's (x, y) inside the sprite)
+        if obstacle_type == "tree":
+            sprite = pygame.Surface((41, 111), pygame.SRCALPHA)
+            x, y = 0, 20
+            pygame.draw.rect(sprite, (80, 50, 20), (x + 12, y + 40, 16, 50))
+            pygame.draw.polygon(sprite, GREEN, [(x + 20, y), (x, y + 60), (x + 40, y + 60)])
+            pygame.draw.polygon(sprite, (40, 180, 40), [(x + 20, y - 20), (x + 5, y + 30), (x + 35, y + 30)])
+        elif obstacle_type == "rock":
+            sprite = pygame.Surface((51, 41), pygame.SRCALPHA)
+            x, y = 0, 0
+            pygame.draw.circle(sprite, GRAY, (x + 25, y + 20), 20)
+            pygame.draw.circle(sprite, (100, 100, 100), (x + 15, y + 15), 8)
+        else:
+            # Bat, relative to its bobbing body; only the wings change per frame
+            sprite = pygame.Surface((51, 31), pygame.SRCALPHA)
+            x, body_y = 5, 15
+            phase = frame * 2 * math.pi / Obstacle.BAT_FRAMES
+            wing_y = body_y - math.cos(phase) * 15
+            pygame.draw.polygon(sprite, PURPLE, [(x + 20, body_y), (x - 5, wing_y), (x + 15, body_y + 10)])
+            pygame.draw.polygon(sprite, PURPLE, [(x + 20, body_y), (x + 45, wing_y), (x + 25, body_y + 10)])
+            pygame.draw.circle(sprite, (50, 20, 50), (x + 20, body_y), 10)
+            pygame.draw.circle(sprite, RED, (x + 17, body_y - 2), 2)
+            pygame.draw.circle(sprite, RED, (x + 23, body_y - 2), 2)
+            y = body_y
+        return sprite, (x, y)
+
+    def draw(self, screen, alpha=1.0):
+        scale = screen.get_height() / SCREEN_HEIGHT
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        y = self.y
+        frame = 0
+        if self.type == "bat":
+            y += math.sin(self.wing_flap) * 10
+            phase = self.wing_flap % (2 * math.pi)
+            frame = int(phase * self.BAT_FRAMES / (2 * math.pi)) % self.BAT_FRAMES
+        sprite, (ox, oy) = sprite_cache.get((self.type, frame), lambda: Obstacle.render_sprite(self.type, frame), scale)
+        screen.blit(sprite, (int(x * scale) - ox, int(y * scale) - oy))
 
     def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+        return self.rect
 
 class Collectible:
-    def __init__(self, x, speed_multiplier):
-        self.x = x
-        self.y = random.randint(300, SCREEN_HEIGHT - 200)
+    __slots__ = ("x", "prev_x", "y", "width", "height", "speed", "collected", "glow_timer", "rect")
+
+    def __init__(self, x, speed_multiplier, rng=random):
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.reset(x, speed_multiplier, rng)
+
+    def reset(self, x, speed_multiplier, rng=random):
+        self.x = self.prev_x = x
+        self.y = rng.randint(300, SCREEN_HEIGHT - 200)
         self.width = 25
         self.height = 25
         self.speed = 5 * speed_multiplier
         self.collected = False
         self.glow_timer = 0
+        self.rect.update(self.x, self.y, self.width, self.height)
         
     def update(self):
+        self.prev_x = self.x
         self.x -= self.speed
+        self.rect.x = int(self.x)
         self.glow_timer += 0.1
         
-    def draw(self, screen):
+    @staticmethod
+    def render_frame(size, glow=True):
+        # The pulse only ever yields a handful of integer sizes, one sprite each
+        sprite = pygame.Surface((50, 50), pygame.SRCALPHA)
+        if glow:
+            pygame.draw.circle(sprite, (255, 255, 100, 100), (25, 25), size + 8)
+        pygame.draw.circle(sprite, GOLD, (24, 24), size)
+        pygame.draw.circle(sprite, WHITE, (24, 24), size // 2)
+        return sprite
+
+    def draw(self, screen, alpha=1.0, glow=True):
         if not self.collected:
-            scale = 1.0 + math.sin(self.glow_timer) * 0.1
-            size = int(12 * scale)
-            s = pygame.Surface((50, 50), pygame.SRCALPHA)
-            pygame.draw.circle(s, (255, 255, 100, 100), (25, 25), size + 8)
-            screen.blit(s, (self.x - 12, self.y - 12))
-            pygame.draw.circle(screen, GOLD, (int(self.x + 12), int(self.y + 12)), size)
-            pygame.draw.circle(screen, WHITE, (int(self.x + 12), int(self.y + 12)), size // 2)
-    
+            scale = screen.get_height() / SCREEN_HEIGHT
+            x = self.prev_x + (self.x - self.prev_x) * alpha
+            pulse = 1.0 + math.sin(self.glow_timer) * 0.1
+            size = int(12 * pulse)
+            sprite = sprite_cache.get(("orb", size, glow), lambda: Collectible.render_frame(size, glow), scale)
+            offset = round(12 * scale)
+            screen.blit(sprite, (int(x * scale) - offset, int(self.y * scale) - offset))
+
     def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+        return self.rect
+
+class EntityPool:
+    # Despawned entities of one class, recycled through their reset().
+    # `allocations` counts the instances actually created; in steady play
+    # every spawn is served from the free list and it stops growing.
+    def __init__(self, cls):
+        self.cls = cls
+        self.free = []
+        self.allocations = 0
+
+    def acquire(self, *args):
+        if self.free:
+            entity = self.free.pop()
+            entity.reset(*args)
+            return entity
+        self.allocations += 1
+        return self.cls(*args)
+
+    def release(self, entity):
+        self.free.append(entity)
+
+class SpawnQueue:
+    # Entities in spawn order, which is also left-to-right order: everything
+    # enters at the right edge and moves left. A later, faster spawn could in
+    # principle overtake (or a caller could append out of order), so
+    # `ordered` is re-checked every update and the fast paths below are only
+    # taken while it holds, keeping results identical to a full scan.
+    def __init__(self, pool=None):
+        self.entities = deque()
+        self.ordered = True
+        self.pool = pool
+
+    def __iter__(self):
+        return iter(self.entities)
+
+    def __len__(self):
+        return len(self.entities)
+
+    def append(self, entity):
+        if self.entities:
+            last = self.entities[-1]
+            if entity.x < last.x or entity.x + entity.width < last.x + last.width:
+                self.ordered = False
+        self.entities.append(entity)
+
+    def update(self):
+        # Moves every entity and retires the ones fully off the left edge;
+        # returns how many were retired
+        ordered = True
+        last_x = last_right = -math.inf
+        for entity in self.entities:
+            entity.update()
+            right = entity.x + entity.width
+            if entity.x < last_x or right < last_right:
+                ordered = False
+            last_x, last_right = entity.x, right
+        self.ordered = ordered
+
+        entities = self.entities
+        if ordered:
+            # Off-screen entities are all at the front
+            retired = 0
+            while entities and entities[0].x + entities[0].width < 0:
+                self.release(entities.popleft())
+                retired += 1
+            return retired
+        kept = deque()
+        for entity in entities:
+            if entity.x + entity.width >= 0:
+                kept.append(entity)
+            else:
+                self.release(entity)
+        retired = len(entities) - len(kept)
+        self.entities = kept
+        return retired
+
+    def release(self, entity):
+        if self.pool is not None:
+            self.pool.release(entity)
+
+    def clear(self):
+        for entity in self.entities:
+            self.release(entity)
+        self.entities.clear()
+        self.ordered = True
+
+    def overlapping(self, left, right):
+        # Broad phase: entities whose x-span may overlap [left, right). Rects
+        # truncate x toward zero, so spans are widened by a pixel each way.
+        ordered = self.ordered
+        for entity in self.entities:
+            if entity.x >= right + 1:
+                if ordered:
+                    break
+                continue
+            if entity.x + entity.width > left - 1:
+                yield entity
+
+class SpriteCache:
+    # Pre-rendered entity frames. Every key family has a fixed frame count, so
+    # the cache stays small; max_bytes is a hard cap that evicts oldest first.
+    def __init__(self, max_bytes=8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.sprites = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def surface_bytes(surface):
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def get(self, key, render, scale=1.0):
+        if scale != 1.0:
+            # Scaled copies of the full-size entry, cached like any other frame
+            return self.get((key, scale), lambda: self.scale_entry(self.get(key, render), scale))
+        entry = self.sprites.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        entry = render()
+        surface = entry[0] if isinstance(entry, tuple) else entry
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+            entry = (surface, entry[1]) if isinstance(entry, tuple) else surface
+        size = self.surface_bytes(surface)
+        while self.sprites and self.bytes + size > self.max_bytes:
+            old_key = next(iter(self.sprites))
+            old = self.sprites.pop(old_key)
+            self.bytes -= self.surface_bytes(old[0] if isinstance(old, tuple) else old)
+        self.sprites[key] = entry
+        self.bytes += size
+        return entry
+
+    @staticmethod
+    def scale_entry(entry, scale):
+        surface, offset = entry if isinstance(entry, tuple) else (entry, None)
+        size = (max(1, round(surface.get_width() * scale)), max(1, round(surface.get_height() * scale)))
+        surface = pygame.transform.smoothscale(surface, size)
+        if offset is None:
+            return surface
+        return surface, (round(offset[0] * scale), round(offset[1] * scale))
+
+    def prerender(self):
+        for frame in range(Ghost.TAIL_FRAMES):
+            self.get(("ghost", frame, True), lambda: Ghost.render_frame(frame))
+        for obstacle_type in ("tree", "rock"):
+            self.get((obstacle_type, 0), lambda: Obstacle.render_sprite(obstacle_type))
+        for frame in range(Obstacle.BAT_FRAMES):
+            self.get(("bat", frame), lambda: Obstacle.render_sprite("bat", frame))
+        for size in range(10, 14):
+            self.get(("orb", size, True), lambda: Collectible.render_frame(size))
+
+    def stats(self):
+        return f"sprites: {len(self.sprites)} frames, {self.bytes / 1024:.0f} KiB (cap {self.max_bytes // 1024} KiB)"
+
+sprite_cache = SpriteCache()
+
+class Background:
+    GROUND_HEIGHT = 100
+    CLOUD_COUNT = 5
+    CLOUD_SPACING = 400
+    CLOUD_SIZE = (100, 50)
+    CLOUD_PARALLAX = 0.5
+
+    def __init__(self):
+        # Target size -> (base, cloud); one per render resolution in use
+        self.layers = {}
+
+    def build(self, size):
+        # Layout is in SCREEN_HEIGHT units, scaled to the target height
+        width, height = size
+        scale = height / SCREEN_HEIGHT
+        # Gradient is one pixel wide, then stretched across the screen
+        column = pygame.Surface((1, height))
+        for y in range(height):
+            logical_y = int(y / scale)
+            r = max(0, min(255, 20 + logical_y // 5))
+            g = max(0, min(255, 20 + logical_y // 6))
+            b = max(0, min(255, 50 + logical_y // 4))
+            column.set_at((0, y), (r, g, b))
+        base = pygame.transform.scale(column, (width, height))
+        ground_height = round(self.GROUND_HEIGHT * scale)
+        ground_y = height - ground_height
+        pygame.draw.rect(base, (20, 60, 20), (0, ground_y, width, ground_height))
+        pygame.draw.line(base, (40, 100, 40), (0, ground_y), (width, ground_y), max(1, round(4 * scale)))
+
+        cloud = pygame.Surface((round(self.CLOUD_SIZE[0] * scale), round(self.CLOUD_SIZE[1] * scale)))
+        cloud.fill(BLACK)
+        cloud.set_colorkey(BLACK)
+        pygame.draw.ellipse(cloud, WHITE, cloud.get_rect())
+
+        if pygame.display.get_surface() is not None:
+            base = base.convert()
+            cloud = cloud.convert()
+        self.layers[size] = (base, cloud)
+        return base, cloud
+
+    def draw(self, screen, background_x, timer, clouds=True):
+        size = screen.get_size()
+        base, cloud = self.layers.get(size) or self.build(size)
+        screen.blit(base, (0, 0))
+        if not clouds:
+            return
+
+        scale = size[1] / SCREEN_HEIGHT
+        wrap = size[0] / scale + 200
+        for i in range(self.CLOUD_COUNT):
+            cloud_x = (background_x * self.CLOUD_PARALLAX + i * self.CLOUD_SPACING) % wrap - 100
+            cloud_y = 100 + i * 40 + math.sin(timer * 0.01 + i) * 20
+            screen.blit(cloud, (cloud_x * scale, cloud_y * scale))
+
+class FrameProfiler:
+    # Per-phase frame timings in a fixed-size ring buffer. Game calls mark()
+    # at the end of each phase; with profiling off Game.profiler is None and
+    # each mark is a single attribute check.
+    PHASES = (
+        "events", "update_menu", "update_playing", "update_paused", "update_game_over",
+        "background", "entities", "particles", "upscale", "hud", "overlays", "profiler", "flip",
+    )
+    OVERLAY_REFRESH = 30
+
+    def __init__(self, capacity=3600, fps=FPS):
+        self.capacity = capacity
+        self.budget_ns = 1_000_000_000 // fps
+        self.phase_index = {phase: i for i, phase in enumerate(self.PHASES)}
+        self.samples = np.zeros((capacity, len(self.PHASES)), dtype=np.int64)
+        # Start-to-start time of each frame, including the clock.tick sleep
+        self.intervals = np.zeros(capacity, dtype=np.int64)
+        # Entity allocations per frame, from a running total passed to end_frame
+        self.allocations = np.zeros(capacity, dtype=np.int64)
+        self.allocation_total = None
+        # QualityGovernor tier each frame was drawn at
+        self.tiers = np.zeros(capacity, dtype=np.int8)
+        self.frames = 0
+        self.dropped = 0
+        self.frame_start = 0
+        self.last = time.perf_counter_ns()
+        self.font = None
+        self.overlay = None
+
+    def begin_frame(self):
+        self.frame_start = self.last = time.perf_counter_ns()
+        self.samples[self.frames % self.capacity] = 0
+
+    def mark(self, phase):
+        now = time.perf_counter_ns()
+        self.samples[self.frames % self.capacity, self.phase_index[phase]] += now - self.last
+        self.last = now
+
+    def end_frame(self, allocation_total=0, tier=0):
+        interval = time.perf_counter_ns() - self.frame_start
+        self.intervals[self.frames % self.capacity] = interval
+        self.tiers[self.frames % self.capacity] = tier
+        if self.allocation_total is None:
+            self.allocation_total = allocation_total
+        self.allocations[self.frames % self.capacity] = allocation_total - self.allocation_total
+        self.allocation_total = allocation_total
+        # Anything past 1.5 budgets missed at least one refresh
+        if interval * 2 > self.budget_ns * 3:
+            self.dropped += 1
+        self.frames += 1
+
+    def recorded(self):
+        # Ring buffer contents in chronological order
+        n = min(self.frames, self.capacity)
+        order = (np.arange(self.frames - n, self.frames)) % self.capacity
+        return self.samples[order], self.intervals[order], self.allocations[order], self.tiers[order]
+
+    def summary(self):
+        samples, intervals, _, _ = self.recorded()
+        if len(intervals) == 0:
+            return []
+        work = samples.sum(axis=1)
+        rows = [("frame", intervals), ("work", work)]
+        rows += [(phase, samples[:, i]) for i, phase in enumerate(self.PHASES) if samples[:, i].any()]
+        return [(name, *(np.percentile(values, (50, 95, 99)) / 1e6)) for name, values in rows]
+
+    def export_csv(self, path):
+        samples, intervals, allocations, tiers = self.recorded()
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + [f"{phase}_us" for phase in self.PHASES]
+                            + ["work_us", "interval_us", "allocs", "tier"])
+            first = self.frames - len(intervals)
+            rows = zip(samples.tolist(), intervals.tolist(), allocations.tolist(), tiers.tolist())
+            for i, (row, interval, allocs, tier) in enumerate(rows):
+                writer.writerow([first + i] + [v // 1000 for v in row] + [sum(row) // 1000, interval // 1000, allocs, tier])
+
+    def draw(self, screen, extra=()):
+        if self.overlay is None or self.frames % self.OVERLAY_REFRESH == 0:
+            if self.font is None:
+                self.font = pygame.font.Font(None, 22)
+            # Rows of (label, p50, p95, p99) cells laid out in fixed columns
+            rows = [("ms", "p50", "p95", "p99")]
+            rows += [(name, f"{p50:.2f}", f"{p95:.2f}", f"{p99:.2f}") for name, p50, p95, p99 in self.summary()]
+            allocations = self.recorded()[2][-self.OVERLAY_REFRESH * 10:]
+            rate = allocations.mean() if len(allocations) else 0.0
+            notes = [f"dropped {self.dropped} / {self.frames} frames", f"entity allocs {rate:.3f} / frame"] + list(extra)
+            line_height = self.font.get_linesize()
+            panel = pygame.Surface((340, 10 + line_height * (len(rows) + len(notes))), pygame.SRCALPHA)
+            panel.fill((0, 0, 0, 170))
+            for i, row in enumerate(rows):
+                y = 5 + i * line_height
+                panel.blit(self.font.render(row[0], True, WHITE), (8, y))
+                for column, cell in enumerate(row[1:]):
+                    text = self.font.render(cell, True, WHITE)
+                    panel.blit(text, (190 + column * 50 - text.get_width(), y))
+            for i, note in enumerate(notes):
+                panel.blit(self.font.render(note, True, WHITE), (8, 5 + (len(rows) + i) * line_height))
+            self.overlay = panel
+        return screen.blit(self.overlay, (SCREEN_WIDTH - self.overlay.get_width() - 10, 70))
+
+class LatencyTracker:
+    # Key press to screen. Each jump key press is stamped when it is polled
+    # and resolved at the first flip after a logic tick has run with it, the
+    # first frame that can show its effect. The key arrived at some point
+    # after the previous poll, so the delay from the previous poll is the
+    # upper bound and from its own poll the lower bound.
+    def __init__(self, capacity=2000):
+        self.from_poll = deque(maxlen=capacity)
+        self.from_previous_poll = deque(maxlen=capacity)
+        # (poll ns, previous poll ns) waiting for a tick, then for a flip
+        self.pending = []
+        self.ticked_keys = []
+
+    def __len__(self):
+        return len(self.from_poll)
+
+    def press(self, poll_ns, previous_poll_ns):
+        self.pending.append((poll_ns, previous_poll_ns))
+
+    def ticked(self):
+        if self.pending:
+            self.ticked_keys += self.pending
+            self.pending = []
+
+    def flipped(self, flip_ns):
+        for poll_ns, previous_poll_ns in self.ticked_keys:
+            self.from_poll.append(flip_ns - poll_ns)
+            self.from_previous_poll.append(flip_ns - previous_poll_ns)
+        self.ticked_keys = []
+
+    def percentiles(self, samples):
+        return np.percentile(np.array(samples), (50, 95, 99)) / 1e6
 
-class Game:
+    def summary(self):
+        # One line per bound: p50 / p95 / p99 in ms
+        lines = []
+        for label, samples in (("from poll", self.from_poll), ("from previous poll", self.from_previous_poll)):
+            p50, p95, p99 = self.percentiles(samples)
+            lines.append(f"input latency {label}: p50 {p50:.1f} p95 {p95:.1f} p99 {p99:.1f} ms")
+        return lines
+
+class FramePacer:
+    # Waits for an absolute perf_counter_ns deadline: sleeps through most of
+    # it and spins the last SPIN_NS, since OS sleeps (and clock.tick's
+    # millisecond delays) overshoot by a millisecond or more
+    SPIN_NS = 1_000_000
+
+    def __init__(self):
+        self.late_ns = 0
+
+    def wait(self, deadline_ns):
+        remaining = deadline_ns - time.perf_counter_ns()
+        if remaining > self.SPIN_NS:
+            time.sleep((remaining - self.SPIN_NS) / 1e9)
+        while time.perf_counter_ns() < deadline_ns:
+            pass
+        self.late_ns = time.perf_counter_ns() - deadline_ns
+
+class QualityGovernor:
+    # Steps effects down when frames run over budget and back up when there
+    # is sustained headroom. Fed the work time of each frame (clock.tick's
+    # sleep excluded). Dropping needs the WINDOW-frame rolling mean over
+    # DOWN_LOAD of the budget; rising needs it under UP_LOAD for up_wait
+    # frames in a row, and a drop soon after a rise doubles up_wait, so a
+    # tier the machine cannot hold is not retried every few seconds.
+    TIERS = (
+        {"name": "high", "particles": 1.0, "glow": True, "clouds": True, "render_scale": 1.0},
+        {"name": "medium", "particles": 0.5, "glow": True, "clouds": False, "render_scale": 1.0},
+        {"name": "low", "particles": 0.25, "glow": False, "clouds": False, "render_scale": 1.0},
+        {"name": "minimal", "particles": 0.25, "glow": False, "clouds": False, "render_scale": 0.5},
+    )
+    # Only 0.5 is used for render_scale: an exact 2x upscale costs about as
+    # much as one opaque full-screen blit, while non-integer factors cost
+    # more than the fill they save
+    WINDOW = 30
+    DOWN_LOAD = 0.9
+    UP_LOAD = 0.5
+    UP_FRAMES = 180
+    MAX_UP_FRAMES = 60 * FPS
+
+    def __init__(self, budget_ms=1000 / FPS, tier=0, adaptive=True):
+        self.budget_ms = budget_ms
+        self.adaptive = adaptive
+        self.tier = tier
+        self.times = deque(maxlen=self.WINDOW)
+        self.total = 0.0
+        self.since_change = 0
+        self.headroom = 0
+        self.up_wait = self.UP_FRAMES
+        self.last_step_up = None
+        self.changes = 0
+
+    @property
+    def settings(self):
+        return self.TIERS[self.tier]
+
+    def observe(self, work_ms):
+        # Returns True when the tier changed
+        if len(self.times) == self.WINDOW:
+            self.total -= self.times[0]
+        self.times.append(work_ms)
+        self.total += work_ms
+        self.since_change += 1
+        if not self.adaptive or self.since_change < self.WINDOW:
+            # Only judge a tier on frames rendered at that tier
+            return False
+
+        mean = self.total / len(self.times)
+        self.headroom = self.headroom + 1 if mean < self.budget_ms * self.UP_LOAD else 0
+        if mean > self.budget_ms * self.DOWN_LOAD and self.tier < len(self.TIERS) - 1:
+            if self.last_step_up is not None and self.since_change < 2 * self.up_wait:
+                self.up_wait = min(self.up_wait * 2, self.MAX_UP_FRAMES)
+            self.last_step_up = None
+            self.set_tier(self.tier + 1)
+            return True
+        if self.headroom >= self.up_wait and self.tier > 0:
+            self.last_step_up = self.tier
+            self.set_tier(self.tier - 1)
+            return True
+        return False
+
+    def set_tier(self, tier):
+        self.tier = tier
+        self.times.clear()
+        self.total = 0.0
+        self.since_change = 0
+        self.headroom = 0
+        self.changes += 1
+
+def new_seed():
+    return int.from_bytes(os.urandom(4), "little")
+
+def seed_arg(value):
+    # Replays store the seed as an unsigned 64-bit integer
+    try:
+        seed = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"seed must be an integer, got {value!r}")
+    if not 0 <= seed < 1 << 64:
+        raise argparse.ArgumentTypeError(f"seed must be between 0 and 2**64 - 1, got {value}")
+    return seed
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+class Replay:
+    # File layout: header (magic, version, seed, frames, score, input count)
+    # followed by the jump frame indices as delta-encoded varints.
+    MAGIC = b"GHRP"
+    VERSION = 1
+    HEADER = struct.Struct("<4sBQIII")
+
+    def __init__(self, seed, inputs, frames=0, score=0):
+        if not 0 <= seed < 1 << 64:
+            raise ValueError(f"Replay seeds are unsigned 64-bit, got {seed}")
+        self.seed = seed
+        self.inputs = list(inputs)
+        self.frames = frames
+        self.score = score
+
+    def to_bytes(self):
+        body = bytearray()
+        previous = 0
+        for frame in self.inputs:
+            _write_varint(body, frame - previous)
+            previous = frame
+        header = self.HEADER.pack(self.MAGIC, self.VERSION, self.seed, self.frames, self.score, len(self.inputs))
+        return header + bytes(body)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, seed, frames, score, count = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError("Not a Ghost Run replay (or an unsupported version)")
+        pos = cls.HEADER.size
+        inputs = []
+        frame = 0
+        for _ in range(count):
+            delta, pos = _read_varint(data, pos)
+            frame += delta
+            inputs.append(frame)
+        return cls(seed, inputs, frames, score)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    def run(self, tuning=None):
+        # Fast-forward: re-simulate headlessly and return the finished Simulation
+        sim = Simulation(tuning=tuning, seed=self.seed)
+        presses = set(self.inputs)
+        while not sim.crashed and (not self.frames or sim.frames < self.frames):
+            sim.step(sim.frames in presses)
+        return sim
+
+def write_atomic(path, data):
+    # Temp file, fsync, rename: readers see the old file or the new one,
+    # never a truncated mix, even if the power goes mid-write
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Write to {path} failed: {e}")
+
+class DiskWriter:
+    # One background thread for files written while the game is running.
+    # Jobs are keyed by path and a newer snapshot replaces one still queued,
+    # so a slow disk only ever falls behind by one write per file.
     def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.pending = OrderedDict()
+        self.condition = threading.Condition()
+        self.closed = False
+        self.thread = threading.Thread(target=self.work, name="disk-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, path, data):
+        with self.condition:
+            self.pending[path] = data
+            self.condition.notify()
+
+    def work(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                path, data = self.pending.popitem(last=False)
+            write_atomic(path, data)
+
+    def close(self, timeout=5.0):
+        # Flushes whatever is queued; called on the way out, never mid-game
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join(timeout)
+
+def write_png(path, rgb, level=1):
+    # Minimal truecolor PNG from an (height, width, 3) uint8 array of any
+    # strides. zlib releases the GIL, so encoder threads run in parallel.
+    height, width, _ = rgb.shape
+    rows = np.empty((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 0] = 0  # filter type: none
+    rows[:, 1:].reshape(height, width, 3)[:] = rgb
+    def chunk(tag, body):
+        return struct.pack(">I", len(body)) + tag + body + struct.pack(">I", zlib.crc32(tag + body))
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(rows, level)))
+        f.write(chunk(b"IEND", b""))
+
+class FrameCapture:
+    # Records frames to a PNG sequence (path is a directory) or one raw
+    # video file in the screen's own pixel layout. submit() copies the
+    # frame into one of queue_size spare surfaces, the only copy on the
+    # game thread, and encoder threads read the spare through a zero-copy
+    # surfarray view. When every spare is still queued that is
+    # backpressure: live capture drops the frame (block=False) so the game
+    # never waits, offline renders wait for a spare (block=True). Both are
+    # counted and reported.
+    def __init__(self, path, fmt="png", workers=2, queue_size=8, block=False, level=1):
+        self.path = path
+        self.fmt = fmt
+        self.block = block
+        self.level = level
+        self.queue_size = queue_size
+        self.free = None
+        self.pending = queue.Queue()
+        self.frames = 0
+        self.dropped = 0
+        self.wait_ns = 0
+        self.size = None
+        self.pix_fmt = None
+        self.errors = []
+        self.started = time.perf_counter()
+        if fmt == "png":
+            os.makedirs(path, exist_ok=True)
+            self.raw = None
+        else:
+            self.raw = open(path, "wb")
+            # Raw frames must land in order, so a single writer
+            workers = 1
+        self.threads = [threading.Thread(target=self.work, name=f"capture-{i}", daemon=True) for i in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, surface):
+        # Returns False if the frame was dropped
+        if self.free is None:
+            self.size = surface.get_size()
+            self.pix_fmt = self.raw_format(surface)
+            self.free = queue.Queue()
+            for _ in range(self.queue_size):
+                self.free.put(surface.copy())
+        try:
+            spare = self.free.get_nowait()
+        except queue.Empty:
+            if not self.block:
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % 100 == 0:
+                    print(f"Capture falling behind: {self.dropped} frames dropped")
+                return False
+            start = time.perf_counter_ns()
+            spare = self.free.get()
+            self.wait_ns += time.perf_counter_ns() - start
+        spare.blit(surface, (0, 0))
+        self.pending.put((self.frames, spare))
+        self.frames += 1
+        return True
+
+    @staticmethod
+    def raw_format(surface):
+        # ffmpeg pix_fmt of the surface's bytes (e.g. "bgr0"), or rgb24 when
+        # the layout needs converting
+        width = surface.get_width()
+        if surface.get_bytesize() != 4 or surface.get_pitch() != width * 4:
+            return "rgb24"
+        masks = surface.get_masks()
+        names = ""
+        for byte in range(4):
+            shift = 8 * byte if sys.byteorder == "little" else 8 * (3 - byte)
+            mask = 0xFF << shift
+            names += "rgba"[masks.index(mask)] if mask in masks else "0"
+        return names
+
+    def backlog(self):
+        return self.queue_size - self.free.qsize() if self.free is not None else 0
+
+    def work(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            index, spare = item
+            try:
+                if self.raw is not None and self.pix_fmt != "rgb24":
+                    # Packed 32-bit rows straight from the surface memory
+                    view = spare.get_view("2")
+                    self.raw.write(view)
+                else:
+                    # (width, height, 3) view into the spare; transposed to rows
+                    view = pygame.surfarray.pixels3d(spare).transpose(1, 0, 2)
+                    if self.raw is not None:
+                        self.raw.write(np.ascontiguousarray(view).data)
+                    else:
+                        write_png(os.path.join(self.path, f"frame_{index:06d}.png"), view, self.level)
+                del view  # releases the surface lock before the spare is reused
+            except (OSError, ValueError, pygame.error) as e:
+                self.errors.append(e)
+            self.free.put(spare)
+
+    def stats(self):
+        return (f"capture: {self.frames} frames, {self.dropped} dropped, "
+                f"{self.wait_ns / 1e6:.0f} ms waiting, backlog {self.backlog()}/{self.queue_size}")
+
+    def close(self):
+        for _ in self.threads:
+            self.pending.put(None)
+        for thread in self.threads:
+            thread.join()
+        if self.raw is not None:
+            self.raw.close()
+        elapsed = time.perf_counter() - self.started
+        print(f"{self.stats()} in {elapsed:.1f}s -> {self.path}")
+        if self.errors:
+            print(f"{len(self.errors)} frames failed to encode, first: {self.errors[0]}")
+        if self.raw is not None and self.size:
+            width, height = self.size
+            print(f"Encode with: ffmpeg -f rawvideo -pix_fmt {self.pix_fmt} -s {width}x{height} -r {FPS} "
+                  f"-i {self.path} capture.mp4")
+
+class Leaderboard:
+    # Best runs first, with the seed so any entry can be replayed. The top
+    # level "highscore" key keeps the file readable by older versions.
+    SIZE = 10
+
+    def __init__(self, path="highscore.json", writer=None, size=SIZE):
+        self.path = path
+        self.writer = writer
+        self.size = size
+        self.runs = []
+        self.load()
+
+    @property
+    def best(self):
+        return self.runs[0]["score"] if self.runs else 0
+
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Could not read {self.path}: {e}")
+            return
+        if not isinstance(data, dict):
+            print(f"Could not read {self.path}: unexpected format")
+            return
+        runs = data.get("runs")
+        if not isinstance(runs, list):
+            # Pre-leaderboard file with just the single best score
+            runs = [{"score": data.get("highscore")}]
+        runs = [r for r in runs if isinstance(r, dict) and isinstance(r.get("score"), int) and r["score"] > 0]
+        self.runs = sorted(runs, key=lambda r: -r["score"])[:self.size]
+
+    def record(self, score, **info):
+        # Returns the 1-based rank, or None if the run did not place
+        if score <= 0:
+            return None
+        rank = sum(1 for r in self.runs if r["score"] >= score)
+        if rank >= self.size:
+            return None
+        self.runs.insert(rank, dict(score=score, date=time.strftime("%Y-%m-%d %H:%M:%S"), **info))
+        del self.runs[self.size:]
+        self.save()
+        return rank + 1
+
+    def save(self):
+        data = json.dumps({"highscore": self.best, "runs": self.runs}, indent=2).encode()
+        if self.writer is not None:
+            self.writer.submit(self.path, data)
+        else:
+            write_atomic(self.path, data)
+
+    def format(self):
+        lines = [f"{'#':>3} {'score':>7} {'frames':>7}  {'seed':<20} {'cause':<6} date"]
+        for i, run in enumerate(self.runs, 1):
+            lines.append(f"{i:>3} {run['score']:>7} {run.get('frames', ''):>7}  {run.get('seed', ''):<20} "
+                         f"{run.get('cause') or '':<6} {run.get('date', '')}")
+        return "\n".join(lines)
+
+class Snapshot:
+    # Gameplay state of a Simulation as flat float64 arrays plus the RNG
+    # state. Holds no pygame objects, so taking or restoring one costs
+    # O(live entities) rather than a deepcopy. Cosmetic state (particles,
+    # sprites, the Game's screens) is not part of it.
+    __slots__ = ("scalars", "obstacles", "collectibles", "rng_state", "inputs")
+    # obstacles rows: x, prev_x, type code, speed, passed, wing_flap
+    # collectibles rows: x, prev_x, y, speed, collected, glow_timer
+    COLUMNS = 6
+
+    def __init__(self, scalars, obstacles, collectibles, rng_state, inputs):
+        self.scalars = scalars
+        self.obstacles = obstacles
+        self.collectibles = collectibles
+        self.rng_state = rng_state
+        # Length of Simulation.inputs; inputs only grow, so restore truncates
+        self.inputs = inputs
+
+class Simulation:
+    # Gameplay rules only: no display, fonts, audio or mouse. Game layers
+    # rendering and sound on top through the on_* hooks.
+
+    # Balance constants; override per instance with Simulation(tuning={...})
+    SPAWN_BASE = 100
+    SPAWN_MIN = 40
+    SPAWN_SCORE_DIVISOR = 50
+    SPAWN_JITTER = 60
+    OBSTACLE_WEIGHTS = (40, 40, 20)
+    LATE_OBSTACLE_WEIGHTS = (30, 30, 40)
+    LATE_SCORE = 500
+    DIFFICULTY_SCORE_DIVISOR = 2000.0
+    JUMP_POWER = Ghost.JUMP_POWER
+    GRAVITY = Ghost.GRAVITY
+
+    def __init__(self, rng=None, tuning=None, seed=None):
+        # Gameplay randomness only ever comes from self.rng, which is seeded
+        # per run so a Replay can reproduce it. A custom rng only needs
+        # random.Random's randint/choices.
+        self.seed = None
+        if rng is not None:
+            self.rng = rng
+        else:
+            self.reseed(seed)
+        for name, value in (tuning or {}).items():
+            if not name.isupper() or not hasattr(Simulation, name):
+                raise ValueError(f"Unknown tuning constant: {name}")
+            setattr(self, name, value)
+        self.obstacle_pool = EntityPool(Obstacle)
+        self.collectible_pool = EntityPool(Collectible)
+        self.obstacles = SpawnQueue(self.obstacle_pool)
+        # Collected orbs stay queued (skipped everywhere) until they retire
+        self.collectibles = SpawnQueue(self.collectible_pool)
+        self.reset_game_logic()
+
+    def reset_game_logic(self):
+        self.ghost = Ghost(self.JUMP_POWER, self.GRAVITY)
+        self.obstacles.clear()
+        self.collectibles.clear()
+        self.score = 0
+        self.obstacle_timer = 0
+        self.collectible_timer = 0
+        self.background_x = 0
+        self.difficulty_multiplier = 1.0
+        self.crashed = False
+        self.crash_type = None
+        self.frames = 0
+        # Frame indices at which jump was pressed, for Replay
+        self.inputs = []
+
+    def reseed(self, seed=None):
+        self.seed = new_seed() if seed is None else seed
+        self.rng = random.Random(self.seed)
+
+    def spawn_obstacle(self):
+        obstacle_types = Obstacle.TYPES
+        if self.score > self.LATE_SCORE:
+            weights = self.LATE_OBSTACLE_WEIGHTS
+        else:
+            weights = self.OBSTACLE_WEIGHTS
+        obstacle_type = self.rng.choices(obstacle_types, weights=weights, k=1)[0]
+        self.obstacles.append(self.obstacle_pool.acquire(SCREEN_WIDTH, obstacle_type, self.difficulty_multiplier))
+
+    def spawn_collectible(self):
+        self.collectibles.append(self.collectible_pool.acquire(SCREEN_WIDTH, self.difficulty_multiplier, self.rng))
+
+    def jump(self):
+        if not self.inputs or self.inputs[-1] != self.frames:
+            self.inputs.append(self.frames)
+        if self.ghost.jump():
+            self.on_jump()
+            return True
+        return False
+
+    def step(self, jump=False):
+        if jump:
+            self.jump()
+
+        self.ghost.update()
+        self.difficulty_multiplier = 1.0 + (self.score / self.DIFFICULTY_SCORE_DIVISOR)
+
+        self.score += 10 * self.obstacles.update()
+        self.collectibles.update()
+
+        self.obstacle_timer += 1
+        spawn_threshold = max(self.SPAWN_MIN, self.SPAWN_BASE - int(self.score / self.SPAWN_SCORE_DIVISOR))
+        if self.obstacle_timer > self.rng.randint(spawn_threshold, spawn_threshold + self.SPAWN_JITTER):
+            self.spawn_obstacle()
+            self.obstacle_timer = 0
+
+        self.collectible_timer += 1
+        if self.collectible_timer > self.rng.randint(180, 300):
+            self.spawn_collectible()
+            self.collectible_timer = 0
+
+        self.check_collisions()
+
+        self.background_x -= 2 * self.difficulty_multiplier
+        if self.background_x <= -SCREEN_WIDTH:
+            self.background_x = 0
+
+        self.frames += 1
+        return not self.crashed
+
+    def check_collisions(self):
+        ghost_rect = self.ghost.rect
+        left, right = ghost_rect.left, ghost_rect.right
+        for obstacle in self.obstacles.overlapping(left, right):
+            if ghost_rect.colliderect(obstacle.get_rect()):
+                self.crashed = True
+                self.crash_type = obstacle.type
+                self.on_crash(obstacle)
+
+        for collectible in self.collectibles.overlapping(left, right):
+            if not collectible.collected and ghost_rect.colliderect(collectible.get_rect()):
+                collectible.collected = True
+                self.score += 50
+                self.on_collect(collectible)
+
+    def snapshot(self):
+        # Needs an rng with random.Random's getstate/setstate
+        ghost = self.ghost
+        crash_code = Obstacle.TYPES.index(self.crash_type) if self.crash_type else -1
+        scalars = np.array([ghost.y, ghost.prev_y, ghost.vel_y, ghost.on_ground, ghost.float_offset,
+                            self.score, self.obstacle_timer, self.collectible_timer, self.background_x,
+                            self.difficulty_multiplier, self.frames, self.crashed, crash_code])
+        obstacles = np.array([(o.x, o.prev_x, Obstacle.TYPES.index(o.type), o.speed, o.passed, o.wing_flap)
+                              for o in self.obstacles], dtype=np.float64).reshape(-1, Snapshot.COLUMNS)
+        collectibles = np.array([(c.x, c.prev_x, c.y, c.speed, c.collected, c.glow_timer)
+                                 for c in self.collectibles], dtype=np.float64).reshape(-1, Snapshot.COLUMNS)
+        return Snapshot(scalars, obstacles, collectibles, self.rng.getstate(), len(self.inputs))
+
+    def restore(self, snapshot):
+        # Continues exactly as the snapshotted Simulation would (given the
+        # same tuning); entities are re-filled from the pools
+        (y, prev_y, vel_y, on_ground, float_offset, score, obstacle_timer, collectible_timer,
+         background_x, difficulty, frames, crashed, crash_code) = snapshot.scalars.tolist()
+        ghost = self.ghost
+        ghost.y, ghost.prev_y, ghost.vel_y = y, prev_y, vel_y
+        ghost.on_ground = bool(on_ground)
+        ghost.float_offset = float_offset
+        ghost.rect.y = int(y)
+        self.score = int(score)
+        self.obstacle_timer = int(obstacle_timer)
+        self.collectible_timer = int(collectible_timer)
+        self.background_x = background_x
+        self.difficulty_multiplier = difficulty
+        self.frames = int(frames)
+        self.crashed = bool(crashed)
+        self.crash_type = Obstacle.TYPES[int(crash_code)] if crash_code >= 0 else None
+        del self.inputs[snapshot.inputs:]
+
+        self.obstacles.clear()
+        for x, prev_x, code, speed, passed, wing_flap in snapshot.obstacles.tolist():
+            obstacle = self.obstacle_pool.acquire(x, Obstacle.TYPES[int(code)])
+            obstacle.prev_x = prev_x
+            obstacle.speed = speed
+            obstacle.passed = bool(passed)
+            obstacle.wing_flap = wing_flap
+            obstacle.rect.x = int(x)
+            self.obstacles.append(obstacle)
+        self.collectibles.clear()
+        for x, prev_x, y, speed, collected, glow_timer in snapshot.collectibles.tolist():
+            # reset() draws a y from the rng; its state is restored below
+            collectible = self.collectible_pool.acquire(x, 1.0, self.rng)
+            collectible.prev_x = prev_x
+            collectible.y = y
+            collectible.speed = speed
+            collectible.collected = bool(collected)
+            collectible.glow_timer = glow_timer
+            collectible.rect.update(int(x), int(y), collectible.width, collectible.height)
+            self.collectibles.append(collectible)
+        self.rng.setstate(snapshot.rng_state)
+
+    def run_episode(self, policy=None, max_frames=None):
+        # policy(sim) -> True to press jump this frame
+        self.reset_game_logic()
+        while not self.crashed and (max_frames is None or self.frames < max_frames):
+            self.step(policy(self) if policy else False)
+        return self.frames
+
+    @property
+    def allocations(self):
+        # Entity instances created so far; flat once the pools are warm
+        return self.obstacle_pool.allocations + self.collectible_pool.allocations
+
+    def replay(self):
+        return Replay(self.seed, self.inputs, self.frames, self.score)
+
+    # Hooks for presentation layers
+    def on_jump(self):
+        pass
+
+    def on_crash(self, obstacle):
+        pass
+
+    def on_collect(self, collectible):
+        pass
+
+class Autopilot:
+    # Search-based policy: autopilot(sim) -> True to jump this frame, usable
+    # wherever a policy is (Simulation.run_episode, Game). A scratch
+    # Simulation restored from a Snapshot of the real one (RNG included, so
+    # it sees exactly the spawns the game will produce) is searched depth
+    # first for a jump schedule that survives HORIZON frames past the
+    # current one. Jumping is only tried at frames where the ghost is on the
+    # ground, latest first when backtracking from a crash. The search keeps
+    # its state between calls and does at most STEP_BUDGET simulation steps
+    # per call beyond what the current frame needs, so the cost is spread
+    # over frames instead of stalling one.
+    HORIZON = 300
+    STEP_BUDGET = 100
+
+    def __init__(self, horizon=HORIZON, step_budget=STEP_BUDGET):
+        self.horizon = horizon
+        self.step_budget = step_budget
+        self.scratch = None
+        self.frame = None
+        self.searches = 0
+        self.steps = 0
+
+    def restart(self, sim):
+        # Fresh search rooted at the live state
+        if self.scratch is None:
+            tuning = {name: value for name, value in vars(sim).items() if name.isupper()}
+            self.scratch = Simulation(rng=random.Random(), tuning=tuning)
+        self.scratch.restore(sim.snapshot())
+        # Frames where jumping is still untried: (frame, snapshot, len(jumps)), oldest first
+        self.branches = deque()
+        self.jumps = []
+        self.jump_frames = set()
+        self.searches += 1
+
+    def __call__(self, sim):
+        # Anything but the next frame of the planned run (a new run, a
+        # manual jump) invalidates the search
+        if self.frame != sim.frames or (sim.inputs and sim.inputs[-1] == sim.frames):
+            self.restart(sim)
+        self.frame = sim.frames + 1
+        # Branch points in the past can no longer be taken
+        while self.branches and self.branches[0][0] < sim.frames:
+            self.branches.popleft()
+        self.search(sim.frames)
+        return sim.frames in self.jump_frames
+
+    def search(self, now):
+        scratch = self.scratch
+        target = now + self.horizon
+        budget = self.step_budget
+        # Past the budget, only search as far as the frame being decided
+        while scratch.frames < target and (budget > 0 or scratch.frames <= now):
+            if scratch.crashed:
+                if not self.branches:
+                    # Every schedule from here crashes; keep running the last one
+                    return
+                _, snapshot, count = self.branches.pop()
+                scratch.restore(snapshot)
+                del self.jumps[count:]
+                self.jumps.append(scratch.frames)
+                self.jump_frames = set(self.jumps)
+                scratch.step(True)
+            else:
+                if scratch.ghost.on_ground:
+                    self.branches.append((scratch.frames, scratch.snapshot(), len(self.jumps)))
+                scratch.step(False)
+            budget -= 1
+            self.steps += 1
+
+class Game(Simulation):
+    # Logic always advances in fixed ticks; rendering runs as fast as
+    # max_fps allows (0 = unlimited) and draws between the last two ticks
+    TICK_NS = 1_000_000_000 // FPS
+    # Past this many ticks per rendered frame the game slows down rather
+    # than spending ever longer catching up
+    MAX_TICKS_PER_FRAME = 5
+
+    def __init__(self, seed=None, playback=None, record_path="last_run.replay", profile=False, profile_csv=None,
+                 max_fps=FPS, interpolate=True, quality="auto", capture=None, autopilot=False, render_scale=1.0,
+                 low_latency=False, latency_report=False, music="loop"):
+        # seed fixes every run's seed; playback is a Replay shown at display speed
+        self.startup_time = self.stage_start = time.perf_counter()
+        # (stage, duration ms, ms since startup_time) for --startup-report
+        self.startup_stages = []
+        self.max_fps = max_fps
+        self.interpolate = interpolate
+        # Paces frames onto tick deadlines with FramePacer instead of clock.tick
+        self.low_latency = low_latency
+        self.pacer = FramePacer()
+        self.latency = LatencyTracker()
+        self.latency_report = latency_report
+        self.alpha = 1.0
+        self.prev_background_x = 0
+        self.lagged_ticks = 0
+        # Snapshot of the dimmed PAUSED / GAME_OVER scene, see draw_frozen
+        self.frozen = None
+        self.frozen_key = None
+        self.button_looks = {}
+        self.profiler_area = None
+        self.dim_overlays = {}
+        # "auto" lets the governor pick; a tier name pins it
+        names = [tier["name"] for tier in QualityGovernor.TIERS]
+        self.governor = QualityGovernor(tier=names.index(quality) if quality != "auto" else 0,
+                                        adaptive=quality == "auto")
+        # Lower resolution target for the world layer, see world_surface
+        self.world = None
+        # Window contents under the profiler panel while frozen, see draw_frozen
+        self.frozen_window = None
+        self.fixed_seed = playback.seed if playback else seed
+        self.playback = playback
+        self.playback_inputs = set(playback.inputs) if playback else None
+        # Autopilot runs are recorded but stay off the leaderboard
+        self.autopilot = Autopilot() if autopilot and not playback else None
+        self.record_path = record_path
+        self.profiler = FrameProfiler() if profile else None
+        self.profile_csv = profile_csv
+        # FrameCapture fed every drawn frame, or None
+        self.capture = capture
+        init_display()
+        self.window = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Ghost Run - Next Gen with Audio")
+        if low_latency:
+            # Mouse motion and text input would otherwise fill the queue;
+            # buttons read the mouse position directly
+            pygame.event.set_blocked(None)
+            pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN,
+                                      pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED])
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 36)
-        self.big_font = pygame.font.Font(None, 80)
+        self.stage_done("display")
+        self.set_render_scale(render_scale)
+        self.stage_done("fonts")
         
         self.state = GameState.MENU
         self.particles = ParticleSystem()
+        self.particles.density = self.governor.settings["particles"]
+        self.background = Background()
+        self.writer = DiskWriter()
         self.load_highscore()
+        self.stage_done("leaderboard")
         
-        # Audio Setup
+        # Audio is set up by start_audio once the menu is showing
         self.synth = Synthesizer()
         self.is_muted = False
-        try:
-            self.jump_sfx = self.synth.generate_jump_sound()
-            self.collect_sfx = self.synth.generate_collect_sound()
-            self.music_loop = self.synth.generate_music_loop()
-            self.has_audio = True
-        except Exception as e:
-            print(f"Audio generation failed: {e}")
-            self.has_audio = False
-            
-        # Try to load custom music if exists
-        if os.path.exists("music.mp3"):
-            try:
-                pygame.mixer.music.load("music.mp3")
-                self.using_custom_music = True
-            except:
-                self.using_custom_music = False
-        else:
-            self.using_custom_music = False
-        
-        if self.has_audio and not self.using_custom_music:
-            self.music_channel = pygame.mixer.Channel(0)
+        self.has_audio = False
+        self.audio_future = None
+        self.audio_cache_hits = None
+        self.using_custom_music = False
+        # "loop" plays the cached 8-beat loop, "stream" a MusicStream
+        self.music = music
+        self.music_stream = None
         
         # UI
         self.start_btn = Button(SCREEN_WIDTH//2 - 100, SCREEN_HEIGHT//2 + 50, 200, 60, "START", BLUE, GREEN, self.start_game)
@@ -393,33 +2023,129 @@ class Game:
         self.toggle_pause_btn = Button(SCREEN_WIDTH - 60, 10, 50, 50, "||", DARK_BLUE, BLUE, self.toggle_pause, font_size=30)
         self.mute_btn = Button(SCREEN_WIDTH - 120, 10, 50, 50, "VOL", DARK_BLUE, BLUE, self.toggle_mute, font_size=24)
 
-        self.reset_game_logic()
+        super().__init__()
+        self.stage_done("ui")
+        # Run by run(), one per frame, after the first frame is on screen
+        self.pending_stages = [("audio", self.start_audio), ("sprites", self.prerender_sprites)]
+        self.first_frame_shown = False
 
-    def load_highscore(self):
+    def set_render_scale(self, scale):
+        # Every draw targets self.screen. Below 1.0 that is an internal
+        # surface scale times the window size, drawn with scaled positions,
+        # sprites and fonts, and present() scales it to the window once per
+        # frame; at 1.0 it is the window itself.
+        self.render_scale = scale
+        if scale == 1.0:
+            self.screen = self.window
+        else:
+            size = (round(SCREEN_WIDTH * scale), round(SCREEN_HEIGHT * scale))
+            self.screen = pygame.Surface(size).convert()
+        self.font = scaled_font(36, scale)
+        self.big_font = scaled_font(80, scale)
+        self.dim_overlays = {}
+        self.frozen = None
+
+    def ui_pos(self, x, y):
+        # SCREEN_WIDTH x SCREEN_HEIGHT coordinates on self.screen
+        return round(x * self.render_scale), round(y * self.render_scale)
+
+    def mouse_pos(self):
+        # The mouse in SCREEN_WIDTH x SCREEN_HEIGHT coordinates, which is
+        # what Button rects use, whatever the window and render sizes
+        x, y = pygame.mouse.get_pos()
+        width, height = self.window.get_size()
+        return x * SCREEN_WIDTH // width, y * SCREEN_HEIGHT // height
+
+    def stage_done(self, name):
+        now = time.perf_counter()
+        self.startup_stages.append((name, (now - self.stage_start) * 1000, (now - self.startup_time) * 1000))
+        self.stage_start = now
+
+    def start_audio(self):
+        # Mixer and music.mp3 on this thread; PCM is loaded from the on-disk
+        # cache (or synthesized on a miss) on a worker thread
+        if not init_audio():
+            print("Audio generation failed: mixer not initialized")
+            return
+        pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio")
+        self.audio_future = pool.submit(self.synth.render_all, AudioCache())
+        pool.shutdown(wait=False)
+
+        # Try to load custom music if exists
+        if os.path.exists("music.mp3"):
+            try:
+                pygame.mixer.music.load("music.mp3")
+                self.using_custom_music = True
+            except pygame.error as e:
+                print(f"Could not load music.mp3: {e}")
+        if self.using_custom_music:
+            if self.is_muted:
+                pygame.mixer.music.set_volume(0)
+            elif self.state == GameState.PLAYING:
+                pygame.mixer.music.play(-1)
+
+    def prerender_sprites(self):
+        # Entity sprites render on demand anyway; this just keeps the
+        # first run free of render hitches
+        sprite_cache.prerender()
+
+    def poll_audio(self):
+        # Called every frame until the background audio load has finished
+        if self.audio_future is None or not self.audio_future.done():
+            return
+        future, self.audio_future = self.audio_future, None
         try:
-            with open("highscore.json", "r") as f:
-                data = json.load(f)
-                self.high_score = data.get("highscore", 0)
-        except:
-            self.high_score = 0
+            buffers, hits = future.result()
+            self.jump_sfx = self.synth.make_sound(buffers["jump"])
+            self.collect_sfx = self.synth.make_sound(buffers["collect"])
+            if self.music == "loop":
+                self.music_loop = self.synth.make_sound(buffers["music"])
+        except Exception as e:
+            print(f"Audio generation failed: {e}")
+            return
+        self.has_audio = True
+        elapsed = (time.perf_counter() - self.startup_time) * 1000
+        self.startup_stages.append(("audio ready", None, elapsed))
+        self.audio_cache_hits = (hits, len(buffers))
 
-    def save_highscore(self):
-        if self.score > self.high_score:
-            self.high_score = self.score
-            with open("highscore.json", "w") as f:
-                json.dump({"highscore": self.high_score}, f)
+        if not self.using_custom_music:
+            self.music_channel = pygame.mixer.Channel(0)
+            if self.music == "stream":
+                self.music_stream = MusicStream(self.synth, self.music_channel)
+        if self.is_muted:
+            # Re-apply the mute to the freshly created sounds
+            self.is_muted = False
+            self.toggle_mute()
+        elif self.state == GameState.PLAYING and not self.using_custom_music:
+            self.play_music()
 
-    def reset_game_logic(self):
-        self.ghost = Ghost()
-        self.obstacles = []
-        self.collectibles = []
-        self.score = 0
-        self.obstacle_timer = 0
-        self.collectible_timer = 0
-        self.background_x = 0
-        self.difficulty_multiplier = 1.0
+    def play_music(self):
+        if self.music_stream is not None:
+            self.music_stream.play()
+        else:
+            self.music_channel.play(self.music_loop, loops=-1)
+
+    def stop_music(self):
+        if self.music_stream is not None:
+            self.music_stream.stop()
+        else:
+            self.music_channel.stop()
+
+    def load_highscore(self):
+        self.leaderboard = Leaderboard(writer=self.writer)
+        self.high_score = self.leaderboard.best
+        self.last_rank = None
+
+    def save_highscore(self):
+        # Only queues the write; the writer thread does the disk I/O
+        self.last_rank = self.leaderboard.record(self.score, seed=self.seed, frames=self.frames,
+                                                 cause=self.crash_type)
+        self.high_score = self.leaderboard.best
 
     def start_game(self):
+        self.reseed(self.fixed_seed)
+        # Cosmetic effects get their own stream so they never shift gameplay
+        self.particles.rng = np.random.default_rng(self.seed)
         self.reset_game_logic()
         self.state = GameState.PLAYING
         # Play Music if not muted
@@ -428,7 +2154,7 @@ class Game:
                 pygame.mixer.music.play(-1)
             elif self.has_audio:
                 if not self.music_channel.get_busy():
-                    self.music_channel.play(self.music_loop, loops=-1)
+                    self.play_music()
                 
     def resume_game(self):
         self.state = GameState.PLAYING
@@ -476,31 +2202,22 @@ class Game:
                 self.collect_sfx.set_volume(1.0)
                 # Restart music if it was stopped/not playing
                 if not self.music_channel.get_busy() and self.state == GameState.PLAYING:
-                     self.music_channel.play(self.music_loop, loops=-1)
+                     self.play_music()
 
 
     def quit_game(self):
-        pygame.quit()
-        sys.exit()
+        # run() finishes the frame and shuts everything down
+        self.running = False
 
     def to_menu(self):
         self.state = GameState.MENU
         if self.using_custom_music:
             pygame.mixer.music.stop()
         elif self.has_audio:
-            self.music_channel.stop()
-
-    def spawn_obstacle(self):
-        obstacle_types = ["tree", "rock", "bat"]
-        if self.score > 500:
-            weights = [30, 30, 40]
-        else:
-            weights = [40, 40, 20]
-        obstacle_type = random.choices(obstacle_types, weights=weights, k=1)[0]
-        self.obstacles.append(Obstacle(SCREEN_WIDTH, obstacle_type, self.difficulty_multiplier))
+            self.stop_music()
 
     def update_menu(self):
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = self.mouse_pos()
         self.start_btn.update(mouse_pos)
         self.quit_btn.update(mouse_pos)
         self.background_x -= 1
@@ -508,65 +2225,47 @@ class Game:
             self.background_x = 0
 
     def update_playing(self):
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = self.mouse_pos()
         self.toggle_pause_btn.update(mouse_pos)
         self.toggle_pause_btn.text = "||"
         self.mute_btn.update(mouse_pos)
-        
-        self.ghost.update()
-        self.difficulty_multiplier = 1.0 + (self.score / 2000.0)
-        
-        for obstacle in self.obstacles[:]:
-            obstacle.update()
-            if obstacle.x + obstacle.width < 0:
-                self.obstacles.remove(obstacle)
-                self.score += 10
-        
-        for collectible in self.collectibles[:]:
-            collectible.update()
-            if collectible.x + collectible.width < 0:
-                self.collectibles.remove(collectible)
-        
-        self.obstacle_timer += 1
-        spawn_threshold = max(40, 100 - int(self.score / 50))
-        if self.obstacle_timer > random.randint(spawn_threshold, spawn_threshold + 60):
-            self.spawn_obstacle()
-            self.obstacle_timer = 0
-            
-        self.collectible_timer += 1
-        if self.collectible_timer > random.randint(180, 300):
-            self.collectibles.append(Collectible(SCREEN_WIDTH, self.difficulty_multiplier))
-            self.collectible_timer = 0
-            
-        ghost_rect = self.ghost.rect
-        for obstacle in self.obstacles:
-            if ghost_rect.colliderect(obstacle.get_rect()):
-                self.particles.emit(self.ghost.x, self.ghost.y, GHOST_COLOR, count=20, speed=5)
-                self.particles.emit(obstacle.x, obstacle.y, obstacle.color, count=10, speed=3)
-                self.save_highscore()
-                self.state = GameState.GAME_OVER
-                if self.using_custom_music:
-                    pygame.mixer.music.stop()
-                elif self.has_audio:
-                    self.music_channel.stop()
-                
-        for collectible in self.collectibles[:]:
-            if not collectible.collected and ghost_rect.colliderect(collectible.get_rect()):
-                collectible.collected = True
-                self.collectibles.remove(collectible)
-                self.score += 50
-                self.particles.emit(collectible.x, collectible.y, GOLD, count=15, speed=4)
-                if self.has_audio:
-                    self.collect_sfx.play()
 
-        self.background_x -= 2 * self.difficulty_multiplier
-        if self.background_x <= -SCREEN_WIDTH:
-            self.background_x = 0
-            
+        if self.playback_inputs is not None:
+            self.step(self.frames in self.playback_inputs)
+        elif self.autopilot is not None:
+            self.step(self.autopilot(self))
+        else:
+            self.step()
         self.particles.update()
+        # Saved once the crash frame has fully finished, so frames/score match.
+        # Playbacks are not new runs and stay off the leaderboard.
+        if self.crashed and self.playback is None:
+            if self.autopilot is None:
+                self.save_highscore()
+            if self.record_path:
+                self.writer.submit(self.record_path, self.replay().to_bytes())
+
+    def on_jump(self):
+        self.particles.emit(self.ghost.x + 10, self.ghost.y + 40, WHITE, count=5, speed=2)
+        if self.has_audio:
+            self.jump_sfx.play()
+
+    def on_crash(self, obstacle):
+        self.particles.emit(self.ghost.x, self.ghost.y, GHOST_COLOR, count=20, speed=5)
+        self.particles.emit(obstacle.x, obstacle.y, obstacle.color, count=10, speed=3)
+        self.state = GameState.GAME_OVER
+        if self.using_custom_music:
+            pygame.mixer.music.stop()
+        elif self.has_audio:
+            self.stop_music()
+
+    def on_collect(self, collectible):
+        self.particles.emit(collectible.x, collectible.y, GOLD, count=15, speed=4)
+        if self.has_audio:
+            self.collect_sfx.play()
 
     def update_paused(self):
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = self.mouse_pos()
         self.resume_btn.update(mouse_pos)
         self.pause_menu_btn.update(mouse_pos)
         self.toggle_pause_btn.update(mouse_pos)
@@ -574,109 +2273,293 @@ class Game:
         self.mute_btn.update(mouse_pos)
 
     def update_game_over(self):
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = self.mouse_pos()
         self.restart_btn.update(mouse_pos)
         self.menu_btn.update(mouse_pos)
         self.particles.update()
 
-    def draw_background(self):
-        for y in range(SCREEN_HEIGHT):
-            r = max(0, min(255, 20 + y // 5))
-            g = max(0, min(255, 20 + y // 6))
-            b = max(0, min(255, 50 + y // 4))
-            pygame.draw.line(self.screen, (r, g, b), (0, y), (SCREEN_WIDTH, y))
-        pygame.draw.rect(self.screen, (20, 60, 20), (0, SCREEN_HEIGHT - 100, SCREEN_WIDTH, 100))
-        pygame.draw.line(self.screen, (40, 100, 40), (0, SCREEN_HEIGHT - 100), (SCREEN_WIDTH, SCREEN_HEIGHT - 100), 4)
+    @property
+    def quality_tier(self):
+        # (tier index, tier name) for telemetry
+        return self.governor.tier, self.governor.settings["name"]
 
-        for i in range(5):
-            cloud_x = (self.background_x * 0.5 + i * 400) % (SCREEN_WIDTH + 200) - 100
-            cloud_y = 100 + i * 40 + math.sin(self.obstacle_timer * 0.01 + i) * 20
-            pygame.draw.ellipse(self.screen, (255, 255, 255, 200), (cloud_x, cloud_y, 100, 50))
+    def apply_quality(self):
+        self.particles.density = self.governor.settings["particles"]
+        # The F3 overlay shows the tier; the console only while profiling
+        if self.profiler is not None:
+            print(f"Quality: {self.governor.settings['name']}")
+
+    def world_surface(self):
+        # Background, entities and particles draw here; when the quality tier
+        # asks for less than the render scale that is a smaller surface
+        # scaled up to the screen afterwards
+        scale = min(self.render_scale, self.governor.settings["render_scale"])
+        if scale == self.render_scale:
+            return self.screen
+        size = (int(SCREEN_WIDTH * scale), int(SCREEN_HEIGHT * scale))
+        if self.world is None or self.world.get_size() != size:
+            self.world = pygame.Surface(size).convert()
+        return self.world
+
+    def draw_background(self, surface=None):
+        x = self.background_x
+        # No blending across the wrap back to 0
+        if x <= self.prev_background_x:
+            x = self.prev_background_x + (x - self.prev_background_x) * self.alpha
+        self.background.draw(surface or self.screen, x, self.obstacle_timer, self.governor.settings["clouds"])
 
     def draw_hud(self):
-        score_surf = self.font.render(f"Score: {self.score}", True, WHITE)
-        self.screen.blit(score_surf, (20, 20))
-        hi_surf = self.font.render(f"HI: {self.high_score}", True, GOLD)
-        self.screen.blit(hi_surf, (20, 60))
+        # Cache hits unless the value changed since the last frame
+        score_surf = text_cache.render(self.font, f"Score: {self.score}", WHITE)
+        self.screen.blit(score_surf, self.ui_pos(20, 20))
+        hi_surf = text_cache.render(self.font, f"HI: {self.high_score}", GOLD)
+        self.screen.blit(hi_surf, self.ui_pos(20, 60))
         
         # Draw Buttons
         self.toggle_pause_btn.draw(self.screen)
         self.mute_btn.draw(self.screen)
 
-    def draw(self):
+    def mark(self, phase):
+        if self.profiler is not None:
+            self.profiler.mark(phase)
+
+    def toggle_profiler(self):
+        if self.profiler is None:
+            self.profiler = FrameProfiler()
+        else:
+            self.export_profile()
+            self.profiler = None
+        # Drop the frozen snapshot so the panel is painted in or out
+        self.frozen = None
+
+    def export_profile(self):
+        if self.profiler is not None and self.profile_csv:
+            self.profiler.export_csv(self.profile_csv)
+            print(f"Profile written to {self.profile_csv}")
+
+    def report_latency(self):
+        if self.latency_report:
+            if len(self.latency):
+                print(f"{len(self.latency)} jump presses")
+                print("\n".join(self.latency.summary()))
+            else:
+                print("No jump presses to measure")
+
+    def tick_deadline(self, accumulator, last, frame_start, max_fps):
+        # Low latency: wake exactly when the next tick is due, so every frame
+        # polls, ticks once and flips straight away; above the tick rate,
+        # frames are simply spaced evenly
+        if max_fps > FPS:
+            return frame_start + 1_000_000_000 // max_fps
+        if not max_fps:
+            return 0
+        ticks_per_frame = max(1, round(FPS / max_fps))
+        return last + self.TICK_NS - accumulator + (ticks_per_frame - 1) * self.TICK_NS
+
+    def dim_overlay(self, alpha):
+        overlay = self.dim_overlays.get(alpha)
+        if overlay is None:
+            overlay = pygame.Surface(self.screen.get_size())
+            overlay.set_alpha(alpha)
+            overlay.fill(BLACK)
+            self.dim_overlays[alpha] = overlay
+        return overlay
+
+    def frozen_buttons(self):
+        if self.state == GameState.PAUSED:
+            # Toggle buttons last: they sit on top of the overlay
+            return [self.resume_btn, self.pause_menu_btn, self.toggle_pause_btn, self.mute_btn]
+        return [self.restart_btn, self.menu_btn]
+
+    def draw_frozen_scene(self):
+        # Everything in PAUSED / GAME_OVER except the buttons
         self.draw_background()
+        self.mark("background")
+        glow = self.governor.settings["glow"]
+        self.ghost.draw(self.screen, glow=glow)
+        for obstacle in self.obstacles:
+            obstacle.draw(self.screen)
+        if self.state == GameState.PAUSED:
+            for collectible in self.collectibles:
+                collectible.draw(self.screen, glow=glow)
+            self.mark("entities")
+            score_surf = text_cache.render(self.font, f"Score: {self.score}", WHITE)
+            self.screen.blit(score_surf, self.ui_pos(20, 20))
+            hi_surf = text_cache.render(self.font, f"HI: {self.high_score}", GOLD)
+            self.screen.blit(hi_surf, self.ui_pos(20, 60))
+            self.mark("hud")
+            self.screen.blit(self.dim_overlay(128), (0, 0))
+            pause_text = text_cache.render(self.big_font, "PAUSED", WHITE)
+            text_rect = pause_text.get_rect(center=self.ui_pos(SCREEN_WIDTH//2, SCREEN_HEIGHT//3 - 50))
+            self.screen.blit(pause_text, text_rect)
+        else:
+            self.mark("entities")
+            self.screen.blit(self.dim_overlay(180), (0, 0))
+            over_text = text_cache.render(self.big_font, "GAME OVER", RED)
+            score_text = text_cache.render(self.font, f"Final Score: {self.score}", WHITE)
+            over_rect = over_text.get_rect(center=self.ui_pos(SCREEN_WIDTH//2, SCREEN_HEIGHT//3))
+            score_rect = score_text.get_rect(center=self.ui_pos(SCREEN_WIDTH//2, SCREEN_HEIGHT//3 + 70))
+            self.screen.blit(over_text, over_rect)
+            self.screen.blit(score_text, score_rect)
+            if self.last_rank is not None:
+                rank_text = text_cache.render(self.font, f"Leaderboard #{self.last_rank}", GOLD)
+                self.screen.blit(rank_text, rank_text.get_rect(center=self.ui_pos(SCREEN_WIDTH//2, SCREEN_HEIGHT//3 + 105)))
+
+    def draw_frozen(self):
+        # PAUSED and GAME_OVER: the dimmed scene is drawn once and kept as a
+        # snapshot. Later frames only restore and repaint buttons whose look
+        # changed (plus the profiler panel) and push just those rects, so a
+        # paused game with a still mouse does no drawing at all.
+        key = (self.state, self.seed, self.frames)
+        full = self.frozen is None or self.frozen_key != key
+        if full:
+            self.draw_frozen_scene()
+            self.frozen = self.screen.copy()
+            self.frozen_key = key
+            self.button_looks = {}
+
+        dirty = []
+        for button in self.frozen_buttons():
+            look = button.look()
+            if self.button_looks.get(button) != look:
+                self.button_looks[button] = look
+                area = button.area(self.render_scale)
+                self.screen.blit(self.frozen, area, area)
+                button.draw(self.screen)
+                dirty.append(area)
+        self.mark("overlays")
+
+        # At a reduced render scale any change is scaled to the whole window
+        # (it only happens on hover changes); the profiler panel then sits
+        # on a copy of that window rather than on self.frozen
+        backdrop = self.frozen
+        if self.screen is not self.window:
+            if full or dirty:
+                pygame.transform.scale(self.screen, self.window.get_size(), self.window)
+                self.frozen_window = self.window.copy() if self.profiler is not None else None
+                full = True
+                self.mark("upscale")
+            backdrop = self.frozen_window
+
+        if self.profiler is not None:
+            if self.profiler_area is not None and backdrop is not None:
+                self.window.blit(backdrop, self.profiler_area, self.profiler_area)
+            self.profiler_area = self.draw_profiler()
+            dirty.append(self.profiler_area)
+            self.mark("profiler")
+
+        if full:
+            pygame.display.flip()
+            self.latency.flipped(time.perf_counter_ns())
+        elif dirty:
+            pygame.display.update(dirty)
+            self.latency.flipped(time.perf_counter_ns())
+        self.mark("flip")
+
+    def draw_profiler(self):
+        gc_runs = sum(stats["collections"] for stats in gc.get_stats())
+        # On the window, after any upscale, so the panel stays legible
+        return self.profiler.draw(self.window, [sprite_cache.stats(), f"particles: {len(self.particles)}",
+                                                f"gc collections: {gc_runs}",
+                                                f"ticks dropped behind: {self.lagged_ticks}",
+                                                f"quality: {self.governor.settings['name']} "
+                                                f"({self.governor.changes} changes)"]
+                                          + ([self.capture.stats()] if self.capture is not None else [])
+                                          + ([self.music_stream.stats()] if self.music_stream is not None else [])
+                                          + (self.latency.summary() if len(self.latency) else []))
+
+    def draw(self):
+        if self.state in (GameState.PAUSED, GameState.GAME_OVER):
+            self.draw_frozen()
+            return
+        self.frozen = None
+        self.profiler_area = None
+
+        world = self.world_surface() if self.state == GameState.PLAYING else self.screen
+        self.draw_background(world)
+        self.mark("background")
         
         if self.state == GameState.MENU:
-            title = self.big_font.render("GHOST RUN", True, WHITE)
-            shadow = self.big_font.render("GHOST RUN", True, BLACK)
-            t_rect = title.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//3))
-            self.screen.blit(shadow, (t_rect.x + 4, t_rect.y + 4))
+            title = text_cache.render(self.big_font, "GHOST RUN", WHITE)
+            shadow = text_cache.render(self.big_font, "GHOST RUN", BLACK)
+            t_rect = title.get_rect(center=self.ui_pos(SCREEN_WIDTH//2, SCREEN_HEIGHT//3))
+            offset = round(4 * self.render_scale)
+            self.screen.blit(shadow, (t_rect.x + offset, t_rect.y + offset))
             self.screen.blit(title, t_rect)
-            pygame.draw.circle(self.screen, GHOST_COLOR, (SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 50), 30)
+            pygame.draw.circle(self.screen, GHOST_COLOR, self.ui_pos(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 50),
+                               round(30 * self.render_scale))
             self.start_btn.draw(self.screen)
             self.quit_btn.draw(self.screen)
+            self.mark("overlays")
             
         elif self.state == GameState.PLAYING:
-            self.ghost.draw(self.screen)
+            glow = self.governor.settings["glow"]
+            self.ghost.draw(world, self.alpha, glow)
             for obstacle in self.obstacles:
-                obstacle.draw(self.screen)
+                obstacle.draw(world, self.alpha)
             for collectible in self.collectibles:
-                collectible.draw(self.screen)
-            self.particles.draw(self.screen)
+                collectible.draw(world, self.alpha, glow)
+            self.mark("entities")
+            self.particles.draw(world)
+            self.mark("particles")
+            if world is not self.screen:
+                pygame.transform.scale(world, self.screen.get_size(), self.screen)
+                self.mark("upscale")
             self.draw_hud()
-        
+            self.mark("hud")
+
+        self.present()
+
+    def present(self):
+        if self.screen is not self.window:
+            pygame.transform.scale(self.screen, self.window.get_size(), self.window)
+            self.mark("upscale")
+        if self.profiler is not None:
+            self.draw_profiler()
+            self.mark("profiler")
+        pygame.display.flip()
+        self.latency.flipped(time.perf_counter_ns())
+        self.mark("flip")
+
+    def update(self):
+        # One fixed logic tick of the current state
+        self.prev_background_x = self.background_x
+        if self.state == GameState.MENU:
+            self.update_menu()
+            self.mark("update_menu")
+        elif self.state == GameState.PLAYING:
+            self.update_playing()
+            self.mark("update_playing")
         elif self.state == GameState.PAUSED:
-            # Draw game elements frozen in background
-            self.ghost.draw(self.screen)
-            for obstacle in self.obstacles:
-                obstacle.draw(self.screen)
-            for collectible in self.collectibles:
-                collectible.draw(self.screen)
-            self.draw_hud() 
-            
-            # Semi-transparent overlay
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-            overlay.set_alpha(128)
-            overlay.fill(BLACK)
-            self.screen.blit(overlay, (0, 0))
-            
-            # Pause Text
-            pause_text = self.big_font.render("PAUSED", True, WHITE)
-            text_rect = pause_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//3 - 50))
-            self.screen.blit(pause_text, text_rect)
-            
-            self.resume_btn.draw(self.screen)
-            self.pause_menu_btn.draw(self.screen)
-            
-            # Re-draw toggle buttons on top of overlay
-            self.toggle_pause_btn.draw(self.screen)
-            self.mute_btn.draw(self.screen)
-            
+            self.update_paused()
+            self.mark("update_paused")
         elif self.state == GameState.GAME_OVER:
-            self.ghost.draw(self.screen)
-            for obstacle in self.obstacles:
-                obstacle.draw(self.screen)
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-            overlay.set_alpha(180)
-            overlay.fill(BLACK)
-            self.screen.blit(overlay, (0, 0))
-            over_text = self.big_font.render("GAME OVER", True, RED)
-            score_text = self.font.render(f"Final Score: {self.score}", True, WHITE)
-            over_rect = over_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//3))
-            score_rect = score_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//3 + 70))
-            self.screen.blit(over_text, over_rect)
-            self.screen.blit(score_text, score_rect)
-            self.restart_btn.draw(self.screen)
-            self.menu_btn.draw(self.screen)
-            
-        pygame.display.flip()
+            self.update_game_over()
+            self.mark("update_game_over")
 
-    def run(self):
-        running = True
-        while running:
-            for event in pygame.event.get():
+    def run(self, until=None):
+        # until() -> True stops the loop (used by --startup-report)
+        self.running = True
+        accumulator = 0
+        last = time.perf_counter_ns()
+        previous_poll = last
+        while self.running and not (until and until()):
+            frame_start = time.perf_counter_ns()
+            if self.profiler is not None:
+                self.profiler.begin_frame()
+            self.poll_audio()
+            if self.music_stream is not None:
+                self.music_stream.feed(self.difficulty_multiplier)
+            events = pygame.event.get()
+            poll = time.perf_counter_ns()
+            for event in events:
                 if event.type == pygame.QUIT:
-                    running = False
+                    self.running = False
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    self.toggle_profiler()
+                if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    # The window contents may be gone; redraw everything
+                    self.frozen = None
                 
                 if self.state == GameState.MENU:
                     self.start_btn.handle_event(event)
@@ -687,10 +2570,9 @@ class Game:
                     self.mute_btn.handle_event(event)
                     if event.type == pygame.KEYDOWN:
                         if event.key == pygame.K_SPACE or event.key == pygame.K_UP:
-                            if self.ghost.jump():
-                                self.particles.emit(self.ghost.x + 10, self.ghost.y + 40, WHITE, count=5, speed=2)
-                                if self.has_audio:
-                                    self.jump_sfx.play()
+                            if self.playback is None and self.autopilot is None:
+                                self.latency.press(poll, previous_poll)
+                                self.jump()
                         if event.key == pygame.K_ESCAPE:
                             self.pause_game()
                                 
@@ -706,24 +2588,149 @@ class Game:
                 elif self.state == GameState.GAME_OVER:
                     self.restart_btn.handle_event(event)
                     self.menu_btn.handle_event(event)
+            previous_poll = poll
 
-            if self.state == GameState.MENU:
-                self.update_menu()
-            elif self.state == GameState.PLAYING:
-                self.update_playing()
-            elif self.state == GameState.PAUSED:
-                self.update_paused()
-            elif self.state == GameState.GAME_OVER:
-                self.update_game_over()
-            
+            self.mark("events")
+
+            now = time.perf_counter_ns()
+            accumulator += now - last
+            last = now
+            ticks = 0
+            while accumulator >= self.TICK_NS:
+                if ticks == self.MAX_TICKS_PER_FRAME:
+                    self.lagged_ticks += accumulator // self.TICK_NS
+                    accumulator %= self.TICK_NS
+                    break
+                self.update()
+                accumulator -= self.TICK_NS
+                ticks += 1
+            if ticks:
+                self.latency.ticked()
+
+            # Nothing moves while frozen, so never spin faster than the tick rate
+            max_fps = self.max_fps or (FPS if self.state in (GameState.PAUSED, GameState.GAME_OVER) else 0)
+            # Frozen states would wobble between their last two ticks, and
+            # tick-paced frames land on a tick, where blending would only
+            # show the previous one
+            moving = self.state in (GameState.PLAYING, GameState.MENU)
+            on_tick = self.low_latency and 0 < max_fps <= FPS
+            self.alpha = accumulator / self.TICK_NS if self.interpolate and moving and not on_tick else 1.0
             self.draw()
-            self.clock.tick(FPS)
+            if self.capture is not None:
+                self.capture.submit(self.window)
+            if not self.first_frame_shown:
+                self.first_frame_shown = True
+                self.stage_done("first frame")
+            elif self.pending_stages:
+                name, setup = self.pending_stages.pop(0)
+                self.stage_start = time.perf_counter()
+                setup()
+                self.stage_done(name)
+            if self.low_latency:
+                frame_ms = (time.perf_counter_ns() - frame_start) / 1e6
+                self.pacer.wait(self.tick_deadline(accumulator, last, frame_start, max_fps))
+            else:
+                if max_fps:
+                    self.clock.tick(max_fps)
+                else:
+                    self.clock.tick()
+                # Raw time excludes tick's sleep: what the frame actually cost
+                frame_ms = self.clock.get_rawtime()
+            if self.state == GameState.PLAYING and self.governor.observe(frame_ms):
+                self.apply_quality()
+            # The profiler may have been toggled on mid-frame by F3
+            if self.profiler is not None and self.profiler.frame_start:
+                self.profiler.end_frame(self.allocations, self.governor.tier)
         
+        self.export_profile()
+        self.report_latency()
+        if self.music_stream is not None:
+            self.music_stream.close()
+        if self.capture is not None:
+            self.capture.close()
+        self.writer.close()
         pygame.quit()
 
-def run_game():
-    game = Game()
+def fast_forward(path):
+    replay = Replay.load(path)
+    start = time.perf_counter()
+    sim = replay.run()
+    elapsed = time.perf_counter() - start
+    print(f"Replay seed {replay.seed}: score {sim.score}, {sim.frames} frames "
+          f"({sim.frames / max(elapsed, 1e-9):,.0f} frames/s)")
+    if (sim.frames, sim.score) != (replay.frames, replay.score):
+        print(f"Mismatch: recording ended at frame {replay.frames} with score {replay.score}")
+        return 1
+    return 0
+
+def startup_report():
+    game = Game(record_path=None)
+    # Until every deferred stage has run and the audio load has landed
+    game.run(until=lambda: not game.pending_stages and game.audio_future is None)
+    print(f"{'stage':<14}{'took':>10}{'at':>10}")
+    print(f"{'import':<14}{IMPORT_MS:>8.1f}ms{'':>10}")
+    for name, took, at in game.startup_stages:
+        took = f"{took:>8.1f}ms" if took is not None else f"{'(bg)':>10}"
+        print(f"{name:<14}{took}{at:>8.1f}ms")
+    if game.audio_cache_hits is not None:
+        hits, sounds = game.audio_cache_hits
+        print(f"audio: {hits}/{sounds} sounds from cache")
+    print(sprite_cache.stats())
+
+def run_game(argv=None):
+    parser = argparse.ArgumentParser(description="Ghost Run")
+    parser.add_argument("--seed", type=seed_arg, help="use this seed for every run")
+    parser.add_argument("--replay", metavar="PATH", help="play back a recorded run")
+    parser.add_argument("--fast", action="store_true", help="with --replay: re-simulate without rendering")
+    parser.add_argument("--record", metavar="PATH", default="last_run.replay",
+                        help="where each run's replay is written on game over")
+    parser.add_argument("--profile", action="store_true", help="start with the frame profiler overlay (F3 toggles)")
+    parser.add_argument("--profile-csv", metavar="PATH", help="write profiler samples here on exit or when toggled off")
+    parser.add_argument("--leaderboard", action="store_true", help="print the saved leaderboard and exit")
+    parser.add_argument("--quality", choices=["auto"] + [tier["name"] for tier in QualityGovernor.TIERS],
+                        default="auto", help="effects tier; auto adapts to measured frame time")
+    parser.add_argument("--render-scale", type=int, choices=[50, 100], default=100, metavar="PERCENT",
+                        help="draw everything at 50%% of the window size and scale it up once per frame; the "
+                             "upscale costs more than a plain frame saves, so this only helps particle-heavy scenes")
+    parser.add_argument("--autopilot", action="store_true",
+                        help="let a lookahead search play; runs are recorded but not ranked")
+    parser.add_argument("--capture", metavar="PATH",
+                        help="record every drawn frame: a directory of PNGs, or with --capture-format raw a raw video "
+                             "file in the screen's native pixel layout (ffmpeg pix_fmt printed on close)")
+    parser.add_argument("--capture-format", choices=["png", "raw"], default="png")
+    parser.add_argument("--music", choices=["loop", "stream"], default="loop",
+                        help="background music: the cached 8-beat loop, or endless generated music that follows the difficulty")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="start up, report how long each stage took and exit")
+    parser.add_argument("--max-fps", type=int, default=FPS,
+                        help=f"render rate cap; 0 renders as fast as possible (logic always ticks at {FPS}/s)")
+    parser.add_argument("--no-interpolate", action="store_true",
+                        help="draw entities at their last tick instead of blending between ticks")
+    parser.add_argument("--low-latency", action="store_true",
+                        help="drop unused event types and pace frames onto tick deadlines with a precise sleep")
+    parser.add_argument("--latency-report", action="store_true",
+                        help="print key press to flip latency percentiles on exit")
+    args = parser.parse_args(argv)
+
+    if args.leaderboard:
+        print(Leaderboard().format())
+        return
+    if args.startup_report:
+        startup_report()
+        return
+
+    if args.replay and args.fast:
+        sys.exit(fast_forward(args.replay))
+    playback = Replay.load(args.replay) if args.replay else None
+    capture = FrameCapture(args.capture, args.capture_format) if args.capture else None
+    game = Game(seed=args.seed, playback=playback, record_path=args.record,
+                profile=args.profile, profile_csv=args.profile_csv,
+                max_fps=args.max_fps, interpolate=not args.no_interpolate, quality=args.quality,
+                capture=capture, autopilot=args.autopilot, render_scale=args.render_scale / 100,
+                low_latency=args.low_latency, latency_report=args.latency_report, music=args.music)
     game.run()
 
+IMPORT_MS = (time.perf_counter() - IMPORT_START) * 1000
+
 if __name__ == "__main__":
     run_game()
\ No newline at end of file
@@ -0,0 +1,307 @@
+import argparse
+import random
+import time
+import numpy as np
+
+from ghost_run_game import SCREEN_WIDTH, SCREEN_HEIGHT, Simulation, Ghost, Obstacle
+
+# Obstacle type codes index these tables; order matches spawn_obstacle
+OBSTACLE_TYPES = ["tree", "rock", "bat"]
+_templates = [Obstacle(0, t) for t in OBSTACLE_TYPES]
+OBSTACLE_WIDTH = np.array([o.width for o in _templates], dtype=np.float64)
+OBSTACLE_HEIGHT = np.array([o.height for o in _templates], dtype=np.float64)
+OBSTACLE_Y = np.array([o.y for o in _templates], dtype=np.float64)
+OBSTACLE_SPEED = _templates[0].speed
+
+_ghost = Ghost()
+GHOST_X = _ghost.x
+GHOST_START_Y = _ghost.y
+GHOST_WIDTH = _ghost.width
+GHOST_HEIGHT = _ghost.height
+JUMP_POWER = Simulation.JUMP_POWER
+GRAVITY = Simulation.GRAVITY
+GROUND_LEVEL = SCREEN_HEIGHT - 100
+
+COLLECTIBLE_SIZE = 25
+COLLECTIBLE_SPEED = 5
+COLLECTIBLE_Y_RANGE = (300, SCREEN_HEIGHT - 200)
+COLLECTIBLE_DELAY_RANGE = (180, 300)
+SPAWN_JITTER = Simulation.SPAWN_JITTER
+
+CUMULATIVE_WEIGHTS = np.cumsum(Simulation.OBSTACLE_WEIGHTS).astype(np.float64)
+LATE_CUMULATIVE_WEIGHTS = np.cumsum(Simulation.LATE_OBSTACLE_WEIGHTS).astype(np.float64)
+
+OBS_DIM = 12
+
+
+class VectorSimulation:
+    # N independent Simulation episodes stepped together. Obstacles and
+    # collectibles live in fixed slots per env; finished envs auto-reset.
+    def __init__(self, num_envs, seed=None, obstacle_slots=8, collectible_slots=4):
+        self.num_envs = num_envs
+        self.rng = np.random.default_rng(seed)
+        n = num_envs
+
+        self.ghost_y = np.zeros(n)
+        self.vel_y = np.zeros(n)
+        self.on_ground = np.zeros(n, dtype=bool)
+
+        self.obs_active = np.zeros((n, obstacle_slots), dtype=bool)
+        self.obs_x = np.zeros((n, obstacle_slots))
+        self.obs_speed = np.zeros((n, obstacle_slots))
+        self.obs_type = np.zeros((n, obstacle_slots), dtype=np.int8)
+
+        self.col_active = np.zeros((n, collectible_slots), dtype=bool)
+        self.col_x = np.zeros((n, collectible_slots))
+        self.col_y = np.zeros((n, collectible_slots))
+        self.col_speed = np.zeros((n, collectible_slots))
+
+        self.score = np.zeros(n, dtype=np.int64)
+        self.obstacle_timer = np.zeros(n, dtype=np.int64)
+        self.collectible_timer = np.zeros(n, dtype=np.int64)
+        self.difficulty_multiplier = np.ones(n)
+        self.frames = np.zeros(n, dtype=np.int64)
+
+        # Result of the most recently finished episode in each env
+        self.final_score = np.zeros(n, dtype=np.int64)
+        self.final_frames = np.zeros(n, dtype=np.int64)
+        self.episodes = np.zeros(n, dtype=np.int64)
+        self.draws = None
+
+        self.reset()
+
+    def reset(self, mask=None):
+        if mask is None:
+            mask = np.ones(self.num_envs, dtype=bool)
+        self.ghost_y[mask] = GHOST_START_Y
+        self.vel_y[mask] = 0
+        self.on_ground[mask] = False
+        self.obs_active[mask] = False
+        self.obs_speed[mask] = 0
+        self.col_active[mask] = False
+        self.col_speed[mask] = 0
+        self.score[mask] = 0
+        self.obstacle_timer[mask] = 0
+        self.collectible_timer[mask] = 0
+        self.difficulty_multiplier[mask] = 1.0
+        self.frames[mask] = 0
+
+    def _spawn_slots(self, active, spawn):
+        # First free slot per spawning env; envs with every slot taken drop the spawn
+        slot = np.argmin(active, axis=1)
+        rows = np.flatnonzero(spawn & ~active[np.arange(self.num_envs), slot])
+        return rows, slot[rows]
+
+    def step(self, jump=None):
+        n = self.num_envs
+        rng = self.rng
+        # Every env draws every value each frame; unused draws are discarded
+        obstacle_offset = rng.integers(0, SPAWN_JITTER + 1, n)
+        type_u = rng.random(n)
+        collectible_delay = rng.integers(COLLECTIBLE_DELAY_RANGE[0], COLLECTIBLE_DELAY_RANGE[1] + 1, n)
+        collectible_y = rng.integers(COLLECTIBLE_Y_RANGE[0], COLLECTIBLE_Y_RANGE[1] + 1, n)
+        self.draws = (obstacle_offset, type_u, collectible_delay, collectible_y)
+        score_before = self.score.copy()
+
+        # Ghost.jump / Ghost.update
+        if jump is not None:
+            jumping = np.asarray(jump, dtype=bool) & self.on_ground
+            self.vel_y[jumping] = JUMP_POWER
+            self.on_ground[jumping] = False
+        self.vel_y[~self.on_ground] += GRAVITY
+        self.ghost_y += self.vel_y
+        landed = self.ghost_y + GHOST_HEIGHT >= GROUND_LEVEL
+        self.ghost_y[landed] = GROUND_LEVEL - GHOST_HEIGHT
+        self.vel_y[landed] = 0
+        self.on_ground = landed
+
+        self.difficulty_multiplier = 1.0 + self.score / Simulation.DIFFICULTY_SCORE_DIVISOR
+
+        # Inactive slots have zero speed, so they can be moved unconditionally
+        self.obs_x -= self.obs_speed
+        gone = self.obs_active & (self.obs_x + OBSTACLE_WIDTH[self.obs_type] < 0)
+        self.score += 10 * gone.sum(axis=1)
+        self.obs_active &= ~gone
+        self.obs_speed[gone] = 0
+
+        self.col_x -= self.col_speed
+        gone = self.col_active & (self.col_x + COLLECTIBLE_SIZE < 0)
+        self.col_active &= ~gone
+        self.col_speed[gone] = 0
+
+        # spawn_obstacle
+        self.obstacle_timer += 1
+        spawn_threshold = np.maximum(Simulation.SPAWN_MIN, Simulation.SPAWN_BASE - self.score // Simulation.SPAWN_SCORE_DIVISOR)
+        spawn = self.obstacle_timer > spawn_threshold + obstacle_offset
+        # random.choices: bisect the cumulative weights with u * total
+        late = (self.score > Simulation.LATE_SCORE)[:, None]
+        cumulative = np.where(late, LATE_CUMULATIVE_WEIGHTS, CUMULATIVE_WEIGHTS)
+        roll = type_u[:, None] * cumulative[:, -1:]
+        obstacle_type = (roll >= cumulative[:, :-1]).sum(axis=1).astype(np.int8)
+        rows, slots = self._spawn_slots(self.obs_active, spawn)
+        self.obs_active[rows, slots] = True
+        self.obs_x[rows, slots] = SCREEN_WIDTH
+        self.obs_speed[rows, slots] = OBSTACLE_SPEED * self.difficulty_multiplier[rows]
+        self.obs_type[rows, slots] = obstacle_type[rows]
+        self.obstacle_timer[spawn] = 0
+
+        self.collectible_timer += 1
+        spawn = self.collectible_timer > collectible_delay
+        rows, slots = self._spawn_slots(self.col_active, spawn)
+        self.col_active[rows, slots] = True
+        self.col_x[rows, slots] = SCREEN_WIDTH
+        self.col_y[rows, slots] = collectible_y[rows]
+        self.col_speed[rows, slots] = COLLECTIBLE_SPEED * self.difficulty_multiplier[rows]
+        self.collectible_timer[spawn] = 0
+
+        # Rect.colliderect on truncated coordinates, as pygame.Rect does
+        ghost_top = np.trunc(self.ghost_y)[:, None]
+        ghost_bottom = ghost_top + GHOST_HEIGHT
+        ox = np.trunc(self.obs_x)
+        oy = OBSTACLE_Y[self.obs_type]
+        hit = (self.obs_active
+               & (GHOST_X < ox + OBSTACLE_WIDTH[self.obs_type]) & (ox < GHOST_X + GHOST_WIDTH)
+               & (ghost_top < oy + OBSTACLE_HEIGHT[self.obs_type]) & (oy < ghost_bottom))
+        crashed = hit.any(axis=1)
+
+        cx = np.trunc(self.col_x)
+        collected = (self.col_active
+                     & (GHOST_X < cx + COLLECTIBLE_SIZE) & (cx < GHOST_X + GHOST_WIDTH)
+                     & (ghost_top < self.col_y + COLLECTIBLE_SIZE) & (self.col_y < ghost_bottom))
+        self.score += 50 * collected.sum(axis=1)
+        self.col_active &= ~collected
+        self.col_speed[collected] = 0
+
+        self.frames += 1
+        reward = self.score - score_before
+        if crashed.any():
+            self.final_score[crashed] = self.score[crashed]
+            self.final_frames[crashed] = self.frames[crashed]
+            self.episodes[crashed] += 1
+            self.reset(crashed)
+        return reward, crashed
+
+    def observe(self):
+        # ghost y, vel_y, on_ground, difficulty, then (dx, y, width, height)
+        # of the next two obstacles ahead of the ghost (zeros when absent)
+        n = self.num_envs
+        obs = np.zeros((n, OBS_DIM), dtype=np.float32)
+        obs[:, 0] = self.ghost_y
+        obs[:, 1] = self.vel_y
+        obs[:, 2] = self.on_ground
+        obs[:, 3] = self.difficulty_multiplier
+        width = OBSTACLE_WIDTH[self.obs_type]
+        ahead = self.obs_active & (self.obs_x + width > GHOST_X)
+        key = np.where(ahead, self.obs_x, np.inf)
+        order = np.argsort(key, axis=1)[:, :2]
+        rows = np.arange(n)[:, None]
+        present = ahead[rows, order]
+        kind = self.obs_type[rows, order]
+        features = np.stack([
+            self.obs_x[rows, order] - GHOST_X,
+            OBSTACLE_Y[kind],
+            OBSTACLE_WIDTH[kind],
+            OBSTACLE_HEIGHT[kind],
+        ], axis=2) * present[:, :, None]
+        obs[:, 4:] = features.reshape(n, 8)
+        return obs
+
+
+def observe_simulation(sim):
+    # observe() for one scalar Simulation, as a batch of one
+    obs = np.zeros((1, OBS_DIM), dtype=np.float32)
+    obs[0, :4] = sim.ghost.y, sim.ghost.vel_y, sim.ghost.on_ground, sim.difficulty_multiplier
+    ahead = sorted((o for o in sim.obstacles if o.x + o.width > GHOST_X), key=lambda o: o.x)
+    for i, obstacle in enumerate(ahead[:2]):
+        obs[0, 4 + 4 * i:8 + 4 * i] = obstacle.x - GHOST_X, obstacle.y, obstacle.width, obstacle.height
+    return obs
+
+
+def heuristic_policy(obs):
+    # Jump when a ground obstacle is about to reach the ghost; ignores bats
+    dx, top = obs[:, 4], obs[:, 5]
+    return (dx > 0) & (dx < 60 + 40 * obs[:, 3]) & (top >= GROUND_LEVEL - 100)
+
+
+class _ScriptedRandom(random.Random):
+    # Replays one env's per-frame vector draws into the scalar Simulation
+    def load(self, obstacle_offset, type_u, collectible_delay, collectible_y):
+        self.obstacle_offset = int(obstacle_offset)
+        self.type_u = float(type_u)
+        self.collectible_delay = int(collectible_delay)
+        self.collectible_y = int(collectible_y)
+
+    def random(self):
+        return self.type_u
+
+    def randint(self, a, b):
+        if b - a == SPAWN_JITTER:
+            return a + self.obstacle_offset
+        if (a, b) == COLLECTIBLE_DELAY_RANGE:
+            return self.collectible_delay
+        if (a, b) == COLLECTIBLE_Y_RANGE:
+            return self.collectible_y
+        raise ValueError(f"Unexpected randint({a}, {b}) in scripted replay")
+
+
+def check_parity(num_envs=8, frames=20000, seed=0, jump_rate=0.005):
+    # Steps the vector env alongside one scalar Simulation per env, fed the
+    # same random draws and jumps, and compares them frame by frame. Jumps
+    # mix heuristic_policy (long, high-score runs) with random presses.
+    # Returns the number of episodes compared; raises AssertionError on drift.
+    vec = VectorSimulation(num_envs, seed=seed)
+    scripted = [_ScriptedRandom() for _ in range(num_envs)]
+    sims = [Simulation(rng=r) for r in scripted]
+    inputs = np.random.default_rng(seed + 1)
+
+    for frame in range(frames):
+        jump = heuristic_policy(vec.observe()) | (inputs.random(num_envs) < jump_rate)
+        _, done = vec.step(jump)
+        for k, sim in enumerate(sims):
+            scripted[k].load(*(d[k] for d in vec.draws))
+            sim.step(bool(jump[k]))
+            where = f"env {k} frame {frame}"
+            if done[k]:
+                assert sim.crashed, f"{where}: vector env crashed, scalar did not"
+                assert vec.final_score[k] == sim.score, f"{where}: final score {vec.final_score[k]} != {sim.score}"
+                assert vec.final_frames[k] == sim.frames, f"{where}: frames {vec.final_frames[k]} != {sim.frames}"
+                sim.reset_game_logic()
+                continue
+            assert not sim.crashed, f"{where}: scalar crashed, vector env did not"
+            assert vec.ghost_y[k] == sim.ghost.y, f"{where}: ghost y {vec.ghost_y[k]} != {sim.ghost.y}"
+            assert vec.score[k] == sim.score, f"{where}: score {vec.score[k]} != {sim.score}"
+            xs = sorted(vec.obs_x[k][vec.obs_active[k]].tolist())
+            assert xs == sorted(o.x for o in sim.obstacles), f"{where}: obstacles differ"
+            xs = sorted(vec.col_x[k][vec.col_active[k]].tolist())
+            assert xs == sorted(c.x for c in sim.collectibles if not c.collected), f"{where}: collectibles differ"
+    return int(vec.episodes.sum())
+
+
+def benchmark(num_envs, frames, seed=0):
+    vec = VectorSimulation(num_envs, seed=seed)
+    inputs = np.random.default_rng(seed + 1)
+    start = time.perf_counter()
+    for _ in range(frames):
+        vec.step(heuristic_policy(vec.observe()) | (inputs.random(num_envs) < 0.005))
+    elapsed = time.perf_counter() - start
+    return num_envs * frames / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched Ghost Run simulator")
+    parser.add_argument("--envs", type=int, default=4096)
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--parity", action="store_true", help="check against the scalar Simulation")
+    args = parser.parse_args()
+
+    if args.parity:
+        episodes = check_parity(frames=args.frames, seed=args.seed)
+        print(f"Parity OK: {args.frames} frames, {episodes} episodes")
+    else:
+        rate = benchmark(args.envs, args.frames, args.seed)
+        print(f"{args.envs} envs: {rate:,.0f} env-frames/s")
+
+
+if __name__ == "__main__":
+    main()